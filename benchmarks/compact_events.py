@@ -0,0 +1,66 @@
+"""
+Compares memory use and manipulator throughput of `ass` lines and `CompactLine`s.
+
+    python benchmarks/compact_events.py [lines]
+
+Needs the package and its dependencies installed.
+"""
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from muxtools_helper_scripts.subtitle import (
+    LinePipeline, iter_events, read_compact, to_compact, from_compact,
+    strip_weird_unicode, remove_credits, unfuck_bd_dx, change_style_for_actor, replace_substr, fix_missing_glyphs, swap_italic_tags,
+)
+from corpus import cr_script, write_script
+
+
+def _pipeline() -> LinePipeline:
+    return LinePipeline(
+        strip_weird_unicode, remove_credits, unfuck_bd_dx, change_style_for_actor(["sign", "on-screen"], None, "Signs"),
+        replace_substr("...", "…"), swap_italic_tags("italics"), fix_missing_glyphs,
+    )
+
+
+def _measure(load) -> tuple[list, float, float]:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    lines = load()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return lines, size / (1 << 20), elapsed
+
+
+def _run(lines:list) -> float:
+    start = time.perf_counter()
+    _pipeline()(lines)
+    return time.perf_counter() - start
+
+
+def main(count:int=100_000) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        file = write_script(Path(tmp) / "bench.ass", cr_script(count))
+        lines, ass_mb, ass_load = _measure(lambda: list(iter_events(file)))
+        ass_run = _run(lines)
+        del lines
+        compact, compact_mb, compact_load = _measure(lambda: read_compact(file))
+        compact_run = _run(compact)
+        # the conversion is lossless
+        expected = list(iter_events(file))
+        _pipeline()(expected)
+        same = [line.dump_with_type() for line in from_compact(compact)] == [line.dump_with_type() for line in expected]
+        roundtrip = [line.dump_with_type() for line in from_compact(to_compact(expected))] == [line.dump_with_type() for line in expected]
+    print(f"{count} events")
+    print(f"  ass lines:     {ass_mb:8.1f} MiB  load {ass_load:6.2f} s  manipulators {ass_run:6.2f} s")
+    print(f"  compact lines: {compact_mb:8.1f} MiB  load {compact_load:6.2f} s  manipulators {compact_run:6.2f} s")
+    print(f"  same result: {same}, lossless roundtrip: {roundtrip}")
+    return int(not (same and roundtrip))
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,174 @@
+"""
+Deterministic synthetic ASS scripts for the benchmarks.
+
+Every generator takes the number of events, a seed and a tag density, the same arguments always give the same script.
+"""
+import random
+from collections.abc import Callable
+from pathlib import Path
+
+
+__all__ = ["cr_script", "bd_dx_script", "signs_script", "karaoke_script", "SCRIPTS", "write_script"]
+
+
+_CR_STYLES = ["Main", "Default", "Top", "Italics", "On Top", "BottomCenter", "Narrator", "Alt", "Flashback"]
+_CR_ACTORS = ["", "", "", "Akari", "Kyouko", "sign", "On-screen", "title"]
+_WORDS = ["the", "a", "we", "should", "go", "Tōkyō", "really", "sensei", "Ōsaka", "what", "is", "this", "no", "way", "ā", "​", "‑", "！", "♪", "「quote」"]
+_CREDITS = ["Übersetzung: someone", "Typesetting: someone", "Subtitle Timing: someone"]
+_BD_DX_STYLES = ["BD DX", "BD DX", "BD DX", "Bottom Left DX", "Bottom Right DX", "Center Left DX", "BD Center", "Center Right DX", "Top Left DX", "Top DX", "Top Right DX", "Default", "Signs"]
+_BD_DX_ACTORS = ["", "", "", "Mio", "Ritsu", "On-screen"]
+_SIGN_TAGS = [
+    lambda rng: rf"\pos({rng.randrange(1920)},{rng.randrange(1080)})",
+    lambda rng: rf"\an{rng.randrange(1, 10)}",
+    lambda rng: rf"\fs{rng.randrange(20, 120)}",
+    lambda rng: rf"\c&H{rng.randrange(1 << 24):06X}&",
+    lambda rng: rf"\3c&H{rng.randrange(1 << 24):06X}&",
+    lambda rng: rf"\bord{rng.randrange(0, 8)}",
+    lambda rng: rf"\blur{rng.randrange(0, 30) / 10}",
+    lambda rng: rf"\fad({rng.randrange(0, 500)},{rng.randrange(0, 500)})",
+    lambda rng: rf"\frz{rng.randrange(-30, 30)}",
+    lambda rng: rf"\fscx{rng.randrange(50, 150)}\fscy{rng.randrange(50, 150)}",
+    lambda rng: rf"\fnArial",
+    lambda rng: rf"\t({rng.randrange(0, 500)},{rng.randrange(500, 1500)},\alpha&HFF&)",
+    lambda rng: rf"\clip({rng.randrange(960)},{rng.randrange(540)},{rng.randrange(960, 1920)},{rng.randrange(540, 1080)})",
+]
+_SIGN_TEXTS = ["Class 2-B", "Kitahara Station", "Closed", "Notice", "Ōtsuka Pharmacy", "♪ Radio ♪", "Student Council", "DANGER", "Exit"]
+_SYLLABLES = ["ka", "ze", "no", "ha", "ra", "ni", "sa", "ku", "yo", "mi", "ta", "i", "to", "ō", "n", " "]
+
+_HEADER = """[Script Info]
+ScriptType: v4.00+
+PlayResX: 1920
+PlayResY: 1080
+WrapStyle: 0
+ScaledBorderAndShadow: yes
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+"""
+_EVENTS = "\n[Events]\nFormat: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+
+
+def _timestamp(ms:int) -> str:
+    cs = ms // 10
+    return f"{cs // 360000}:{cs // 6000 % 60:02}:{cs // 100 % 60:02}.{cs % 100:02}"
+
+
+def _style(name:str, font:str="Trebuchet MS", size:int=72, alignment:int=2, italic:bool=False) -> str:
+    return f"Style: {name},{font},{size},&H00FFFFFF,&H000000FF,&H00000000,&H80000000,-1,{-1 if italic else 0},0,0,100,100,0,0,1,3.5,1.5,{alignment},150,150,55,1\n"
+
+
+def _event(layer:int, start:int, end:int, style:str, actor:str, text:str, effect:str="", kind:str="Dialogue") -> str:
+    return f"{kind}: {layer},{_timestamp(start)},{_timestamp(end)},{style},{actor},0,0,0,{effect},{text}\n"
+
+
+def cr_script(lines:int, seed:int=0, tag_density:float=0.2) -> str:
+    """
+    Crunchyroll-like dialogue script with sign actors, credits, macrons and some weird unicode.
+    `tag_density` is the share of lines wrapped in italic tags.
+    """
+    rng = random.Random(seed)
+    out = [_HEADER]
+    for style in _CR_STYLES:
+        out.append(_style(style, alignment=8 if "top" in style.casefold() else 2, italic=style in ("Italics", "Narrator")))
+    out.append(_EVENTS)
+    start = 0
+    for i in range(lines):
+        start += rng.randrange(0, 3000)
+        end = start + rng.randrange(500, 6000)
+        if i % 97 == 0:
+            text = rng.choice(_CREDITS)
+        else:
+            text = " ".join(rng.choice(_WORDS) for _ in range(rng.randrange(3, 12)))
+            if rng.random() < tag_density:
+                text = r"{\i1}" + text + r"{\i0}"
+        out.append(_event(0, start, end, rng.choice(_CR_STYLES), rng.choice(_CR_ACTORS), text))
+    return "".join(out)
+
+
+def bd_dx_script(lines:int, seed:int=0, tag_density:float=0.1) -> str:
+    """
+    BD DX-like script that positions lines with styles (see `BD_DX_POSITION_STYLES`) instead of \\an tags.
+    `tag_density` is the share of lines with an override block (italics or a position).
+    """
+    rng = random.Random(seed)
+    out = [_HEADER]
+    for style in _BD_DX_STYLES[2:]:
+        out.append(_style(style, "Arial", 60, alignment=8 if "top" in style.casefold() else 2))
+    out.append(_EVENTS)
+    start = 0
+    for i in range(lines):
+        start += rng.randrange(0, 3000)
+        end = start + rng.randrange(500, 6000)
+        text = " ".join(rng.choice(_WORDS) for _ in range(rng.randrange(3, 12)))
+        if rng.random() < tag_density:
+            text = (r"{\i1}" if rng.random() < 0.5 else rf"{{\pos({rng.randrange(1920)},{rng.randrange(1080)})}}") + text
+        out.append(_event(0, start, end, rng.choice(_BD_DX_STYLES), rng.choice(_BD_DX_ACTORS), text))
+    return "".join(out)
+
+
+def signs_script(lines:int, seed:int=0, tag_density:float=6.0) -> str:
+    """
+    Typesetting-heavy script: layered signs with many override tags, several override blocks per line and some drawings.
+    `tag_density` is the average number of override tags per line.
+    """
+    rng = random.Random(seed)
+    out = [_HEADER]
+    for style in ("Default", "Signs", "Signs Top", "Drawing"):
+        out.append(_style(style, "Arial", 48, alignment=8 if "Top" in style else 5))
+    out.append(_EVENTS)
+    start = 0
+    for _ in range(lines):
+        start += rng.randrange(0, 200)
+        end = start + rng.randrange(40, 4000)
+        tags = max(1, round(rng.expovariate(1 / tag_density)))
+        if rng.random() < 0.1:
+            drawing = " ".join(f"l {rng.randrange(200)} {rng.randrange(200)}" for _ in range(rng.randrange(3, 20)))
+            text = rf"{{\an7\pos({rng.randrange(1920)},{rng.randrange(1080)})\p1}}m 0 0 {drawing}{{\p0}}"
+            style = "Drawing"
+        else:
+            words = rng.choice(_SIGN_TEXTS).split(" ")
+            blocks = min(tags, len(words))
+            per_block = [tags // blocks + (i < tags % blocks) for i in range(blocks)]
+            text = "".join("{" + "".join(rng.choice(_SIGN_TAGS)(rng) for _ in range(count)) + "}" + word + (" " if i < len(words) - 1 else "") for i, (count, word) in enumerate(zip(per_block, words)))
+            text += " ".join(words[blocks:])
+            style = rng.choice(("Signs", "Signs Top", "Default"))
+        out.append(_event(rng.randrange(0, 4), start, end, style, "sign", text))
+    return "".join(out)
+
+
+def karaoke_script(lines:int, seed:int=0, tag_density:float=0.3) -> str:
+    """
+    Song script with \\k timed romaji, a translation line per romaji line and commented karaoke templates.
+    `tag_density` is the share of syllables that get an extra color or transform tag.
+    """
+    rng = random.Random(seed)
+    out = [_HEADER]
+    for style in ("Default", "Romaji", "Kanji", "English"):
+        out.append(_style(style, "Arial", 52, alignment=8 if style in ("Romaji", "Kanji") else 2))
+    out.append(_EVENTS)
+    out.append(_event(0, 0, 0, "Romaji", "", r'!retime("line",-150,150)!{\fad(150,150)}', "template line", "Comment"))
+    out.append(_event(0, 0, 0, "Romaji", "", r"{\t($start,$mid,\fscx120)}", "template syl", "Comment"))
+    start = 0
+    for i in range(lines):
+        start += rng.randrange(1000, 5000)
+        if i % 2:
+            end = start + rng.randrange(2000, 5000)
+            out.append(_event(0, start, end, "English", "", " ".join(rng.choice(_WORDS) for _ in range(rng.randrange(4, 10)))))
+            continue
+        syllables = []
+        duration = 0
+        for _ in range(rng.randrange(6, 20)):
+            length = rng.randrange(8, 60)
+            duration += length * 10
+            extra = rf"\1c&H{rng.randrange(1 << 24):06X}&\t(\fscx110)" if rng.random() < tag_density else ""
+            syllables.append(rf"{{\k{length}{extra}}}{rng.choice(_SYLLABLES)}")
+        out.append(_event(1, start, start + duration, "Romaji", "", "".join(syllables), "karaoke"))
+    return "".join(out)
+
+
+SCRIPTS:dict[str, Callable[..., str]] = {"cr": cr_script, "bd_dx": bd_dx_script, "signs": signs_script, "karaoke": karaoke_script}
+
+
+def write_script(path:Path, content:str) -> Path:
+    path.write_text(content, encoding="utf_8_sig")
+    return path
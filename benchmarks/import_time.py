@@ -0,0 +1,62 @@
+"""
+Measures the cold import time of the package and fails if it's above a threshold.
+Also checks that the lazy exports of every subpackage match the `__all__` of their submodules.
+
+    python benchmarks/import_time.py [threshold in ms]
+
+Needs the package and its dependencies installed.
+"""
+import re
+import statistics
+import subprocess
+import sys
+from importlib import import_module
+
+
+RUNS = 7
+THRESHOLD_MS = 50.0
+_IMPORT_TIME = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| muxtools_helper_scripts$", re.MULTILINE)
+
+
+def cold_import_ms() -> float:
+    # every run is a fresh interpreter, -X importtime reports the cumulative time of the package import
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import muxtools_helper_scripts"], capture_output=True, text=True, check=True)
+    return int(_IMPORT_TIME.search(result.stderr).group(1)) / 1000
+
+
+def cold_first_use_ms(name:str) -> float:
+    code = f"import time; start = time.perf_counter(); import muxtools_helper_scripts; muxtools_helper_scripts.{name}; print((time.perf_counter() - start) * 1000)"
+    return float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout)
+
+
+def check_exports() -> list[str]:
+    problems = []
+    for subpackage in ("muxing", "subtitle", "utils"):
+        package = import_module(f"muxtools_helper_scripts.{subpackage}")
+        for name in package.__all__:
+            getattr(package, name)
+        exported = set(package.__all__)
+        for module_name in {getattr(package, name).__module__ for name in package.__all__ if hasattr(getattr(package, name), "__module__")}:
+            module = import_module(module_name)
+            if missing := set(getattr(module, "__all__", ())) - exported:
+                problems.append(f"{subpackage} doesn't export {sorted(missing)} from {module_name}")
+    return problems
+
+
+def main(threshold:float=THRESHOLD_MS) -> int:
+    times = [cold_import_ms() for _ in range(RUNS)]
+    median = statistics.median(times)
+    print(f"import muxtools_helper_scripts: median {median:.1f} ms, min {min(times):.1f} ms over {RUNS} runs (threshold {threshold:.1f} ms)")
+    first_use = statistics.median(cold_first_use_ms("restyle_cr") for _ in range(3))
+    print(f"import + first access of restyle_cr (imports muxtools etc.): median {first_use:.1f} ms")
+    problems = check_exports()
+    for problem in problems:
+        print(problem)
+    if median > threshold:
+        print("Import time regressed past the threshold.")
+        return 1
+    return int(bool(problems))
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(float(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,68 @@
+"""
+Compares the old remove-per-line approach with the single pass rebuild used by remove_credits and trim_subs.
+
+    python benchmarks/line_removal.py
+
+Needs the package and its dependencies installed.
+"""
+import time
+from datetime import timedelta
+from fractions import Fraction
+from ass import Document
+from muxtools_helper_scripts.subtitle.line_manipulators import remove_credits, trim_subs
+from corpus import cr_script
+
+
+_CREDITS = ["Übersetzung:", "Spotting:", "Revision:", "Typesetting:", "Qualitätskontrolle:", "Projektleitung:", "ToonsHub", "KawaSubs", "Subtitle Timing", "Editing & Typesetting"]
+
+
+def _old_remove_credits(lines):
+    removed_lines = []
+    for line in lines:
+        if any(credit in line.text for credit in _CREDITS):
+            removed_lines.append(line)
+    for line in removed_lines:
+        lines.remove(line)
+    return lines
+
+
+def _old_trim_subs(upper_bound:int):
+    upper_bound = timedelta(seconds=float(upper_bound / Fraction(24000, 1001)))
+
+    def _trim(lines):
+        removed_lines = []
+        for line in lines:
+            if (line.start - upper_bound) > timedelta():
+                removed_lines.append(line)
+        for line in removed_lines:
+            lines.remove(line)
+        return lines
+    return _trim
+
+
+def _events(count:int) -> list:
+    return list(Document.parse_string(cr_script(count)).events)
+
+
+def _time(func, lines:list) -> float:
+    start = time.perf_counter()
+    func(lines)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    # keeps roughly the first 500 lines, so most of the script gets removed
+    upper_bound = 17_000
+    old_trim, new_trim = _old_trim_subs(upper_bound), trim_subs(upper_bound=upper_bound)
+    print(f"{'lines':>8} {'old credits':>12} {'new credits':>12} {'old trim':>12} {'new trim':>12}")
+    for count in (1_000, 10_000, 100_000):
+        # the old versions are quadratic, 100k lines would take minutes
+        old_credits = _time(_old_remove_credits, _events(count)) if count <= 10_000 else None
+        new_credits = _time(remove_credits, _events(count))
+        old_trimmed = _time(old_trim, _events(count)) if count <= 10_000 else None
+        new_trimmed = _time(new_trim, _events(count))
+        print(f"{count:>8}", *(f"{value * 1000:10.1f}ms" if value is not None else f"{'skipped':>12}" for value in (old_credits, new_credits, old_trimmed, new_trimmed)))
+
+
+if __name__ == "__main__":
+    main()
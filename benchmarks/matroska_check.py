@@ -0,0 +1,89 @@
+"""
+Checks `read_matroska_tracks` against the fixtures of mkv_fixtures.py and, if ffprobe is installed, against `ParsedFile`.
+Extra MKV files (e.g. real episodes) can be passed to compare them with `ParsedFile` as well.
+
+    python benchmarks/matroska_check.py [file.mkv ...]
+
+Exits with 1 if any track differs. Needs the package and its dependencies installed.
+"""
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from muxtools import ParsedFile, TrackType
+from muxtools_helper_scripts.utils import read_matroska_tracks
+from mkv_fixtures import FIXTURES
+
+
+_TRACK_TYPES = {"video": TrackType.VIDEO, "audio": TrackType.AUDIO, "sub": TrackType.SUB}
+
+
+def _compare(name:str, expected:dict, actual:dict) -> list[str]:
+    return [f"{name}: {key} is {actual[key]!r}, expected {expected[key]!r}" for key in expected if actual[key] != expected[key]]
+
+
+def check_fixture(fixture, path:Path) -> list[str]:
+    parsed = read_matroska_tracks(path)
+    if len(parsed.tracks) != len(fixture.tracks):
+        return [f"{fixture.name}: read {len(parsed.tracks)} tracks, expected {len(fixture.tracks)}"]
+    problems = []
+    counts = dict[str, int]()
+    for index, (track, read) in enumerate(zip(fixture.tracks, parsed.tracks)):
+        relative_index = counts.get(track.type, 0)
+        counts[track.type] = relative_index + 1
+        expected = {
+            "index": index, "relative_index": relative_index, "type": _TRACK_TYPES[track.type], "codec_id": track.codec_id, "title": track.title,
+            "language": track.expected_language, "language_ietf": track.language_ietf, "is_default": track.expected_default, "is_forced": track.is_forced,
+        }
+        problems += _compare(f"{fixture.name} track {index}", expected, vars(read))
+    for track_type in _TRACK_TYPES.values():
+        found = parsed.find_tracks(type=track_type)
+        if [track.index for track in found] != [track.index for track in parsed.tracks if track.type == track_type]:
+            problems.append(f"{fixture.name}: find_tracks(type={track_type.name}) returned the wrong tracks")
+    return problems
+
+
+def check_probe(path:Path) -> list[str]:
+    """
+    Compares the attributes both readers provide. Languages are compared by their base language, ffprobe ignores LanguageBCP47.
+    """
+    parsed = read_matroska_tracks(path)
+    probed = ParsedFile.from_file(path, allow_mkvmerge_warning=False)
+    if len(parsed.tracks) != len(probed.tracks):
+        return [f"{path.name}: read {len(parsed.tracks)} tracks, ffprobe found {len(probed.tracks)}"]
+    problems = []
+    for read, probe in zip(parsed.tracks, probed.tracks):
+        expected = {
+            "index": probe.index, "type": probe.type, "codec_name": probe.codec_name, "title": probe.title,
+            "language": probe.sanitized_lang.language, "is_default": probe.is_default, "is_forced": probe.is_forced,
+        }
+        actual = {key: getattr(read, key) for key in expected} | {"language": read.sanitized_lang.language}
+        # codec names only matter for the codecs read_matroska_tracks knows
+        if actual["codec_name"] == read.codec_id:
+            del expected["codec_name"]
+        problems += _compare(f"{path.name} track {read.index}", expected, actual)
+    return problems
+
+
+def main() -> int:
+    has_ffprobe = shutil.which("ffprobe") is not None
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for fixture in FIXTURES:
+            path = fixture.write(Path(tmp))
+            problems += check_fixture(fixture, path)
+            if has_ffprobe:
+                problems += check_probe(path)
+            print(f"{fixture.name:25} {path.stat().st_size:6} bytes  {fixture.notes}")
+    for file in sys.argv[1:]:
+        problems += check_probe(Path(file))
+    if not has_ffprobe:
+        print("ffprobe not found, only compared with the expected tracks.")
+    for problem in problems:
+        print(problem)
+    print("OK" if not problems else f"{len(problems)} difference(s).")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
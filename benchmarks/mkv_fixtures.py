@@ -0,0 +1,253 @@
+"""
+Builds small Matroska files with known track headers for checking `read_matroska_tracks` (see matroska_check.py).
+
+The files only contain the EBML header, Info, Tracks, an optional SeekHead and clusters, so they are a few hundred bytes.
+Each fixture lists the tracks it contains and the layout variations the reader has to handle.
+Subtitle tracks made with `ass_track` also get their events as blocks, so they can be extracted (see watch_check.py).
+Doesn't need the package or any external tool.
+"""
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+
+# Element IDs, see https://www.matroska.org/technical/elements.html
+EBML = 0x1A45DFA3
+EBML_VERSION = 0x4286
+EBML_READ_VERSION = 0x42F7
+EBML_MAX_ID_LENGTH = 0x42F2
+EBML_MAX_SIZE_LENGTH = 0x42F3
+DOC_TYPE = 0x4282
+DOC_TYPE_VERSION = 0x4287
+DOC_TYPE_READ_VERSION = 0x4285
+SEGMENT = 0x18538067
+SEEK_HEAD = 0x114D9B74
+SEEK = 0x4DBB
+SEEK_ID = 0x53AB
+SEEK_POSITION = 0x53AC
+INFO = 0x1549A966
+TIMESTAMP_SCALE = 0x2AD7B1
+MUXING_APP = 0x4D80
+WRITING_APP = 0x5741
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_NUMBER = 0xD7
+TRACK_UID = 0x73C5
+TRACK_TYPE = 0x83
+FLAG_ENABLED = 0xB9
+FLAG_DEFAULT = 0x88
+FLAG_FORCED = 0x55AA
+NAME = 0x536E
+LANGUAGE = 0x22B59C
+LANGUAGE_BCP47 = 0x22B59D
+CODEC_ID = 0x86
+CODEC_PRIVATE = 0x63A2
+VIDEO = 0xE0
+PIXEL_WIDTH = 0xB0
+PIXEL_HEIGHT = 0xBA
+AUDIO = 0xE1
+SAMPLING_FREQUENCY = 0xB5
+CHANNELS = 0x9F
+CLUSTER = 0x1F43B675
+TIMESTAMP = 0xE7
+BLOCK_GROUP = 0xA0
+BLOCK = 0xA1
+BLOCK_DURATION = 0x9B
+VOID = 0xEC
+
+UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+TYPES = {"video": 1, "audio": 2, "sub": 17}
+
+_ASS_HEADER = "[Script Info]\nScriptType: v4.00+\n\n[V4+ Styles]\nFormat: Name, Fontname, Fontsize\nStyle: Default,Arial,20\n\n[Events]\nFormat: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+
+
+def element_id(value:int) -> bytes:
+    return value.to_bytes((value.bit_length() + 7) // 8, "big")
+
+
+def size_vint(size:int) -> bytes:
+    length = 1
+    # all ones is reserved for unknown sizes
+    while size >= (1 << (7 * length)) - 1:
+        length += 1
+    return (size | (1 << (7 * length))).to_bytes(length, "big")
+
+
+def element(id:int, data:bytes) -> bytes:
+    return element_id(id) + size_vint(len(data)) + data
+
+
+def master(id:int, *children:bytes) -> bytes:
+    return element(id, b"".join(children))
+
+
+def uint(id:int, value:int, width:int|None=None) -> bytes:
+    return element(id, value.to_bytes(width or max((value.bit_length() + 7) // 8, 1), "big"))
+
+
+def string(id:int, value:str) -> bytes:
+    return element(id, value.encode("utf-8"))
+
+
+def double(id:int, value:float) -> bytes:
+    return element(id, struct.pack(">d", value))
+
+
+@dataclass
+class Track:
+    type: str
+    codec_id: str
+    title: str | None = None
+    language: str | None = None
+    """None leaves the element out, readers have to use the spec default 'eng'."""
+    language_ietf: str | None = None
+    is_default: bool | None = None
+    """None leaves the element out, readers have to use the spec default True."""
+    is_forced: bool = False
+    codec_private: str | None = None
+    """Defaults to a minimal ASS header for S_TEXT/ASS tracks."""
+    events: list[tuple[int, int, str]] | None = None
+    """(start ms, end ms, block data) of a subtitle track, written as one cluster per event."""
+
+    def entry(self, number:int) -> bytes:
+        children = [uint(TRACK_NUMBER, number), uint(TRACK_UID, 0x1000 + number), uint(TRACK_TYPE, TYPES[self.type]), string(CODEC_ID, self.codec_id)]
+        if self.title is not None:
+            children.append(string(NAME, self.title))
+        if self.language is not None:
+            children.append(string(LANGUAGE, self.language))
+        if self.language_ietf is not None:
+            children.append(string(LANGUAGE_BCP47, self.language_ietf))
+        if self.is_default is not None:
+            children.append(uint(FLAG_DEFAULT, int(self.is_default)))
+        if self.is_forced:
+            children.append(uint(FLAG_FORCED, 1))
+        if self.type == "video":
+            children.append(master(VIDEO, uint(PIXEL_WIDTH, 64), uint(PIXEL_HEIGHT, 36)))
+        elif self.type == "audio":
+            children.append(master(AUDIO, double(SAMPLING_FREQUENCY, 48000.0), uint(CHANNELS, 2)))
+        elif self.codec_private is not None or self.codec_id == "S_TEXT/ASS":
+            children.append(element(CODEC_PRIVATE, (self.codec_private or _ASS_HEADER).encode("utf-8")))
+        return master(TRACK_ENTRY, *children)
+
+    @property
+    def expected_language(self) -> str:
+        return self.language or "eng"
+
+    @property
+    def expected_default(self) -> bool:
+        return True if self.is_default is None else self.is_default
+
+
+@dataclass
+class Fixture:
+    name: str
+    tracks: list[Track]
+    seek_head: bool = True
+    """Write a SeekHead pointing to Info and Tracks."""
+    tracks_after_clusters: bool = False
+    """Write the Tracks element after the clusters, only reachable through the SeekHead."""
+    unknown_segment_size: bool = False
+    void_before_tracks: bool = False
+    clusters: int = 2
+    notes: str = ""
+
+    def build(self) -> bytes:
+        header = master(
+            EBML, uint(EBML_VERSION, 1), uint(EBML_READ_VERSION, 1), uint(EBML_MAX_ID_LENGTH, 4), uint(EBML_MAX_SIZE_LENGTH, 8),
+            string(DOC_TYPE, "matroska"), uint(DOC_TYPE_VERSION, 4), uint(DOC_TYPE_READ_VERSION, 2),
+        )
+        info = master(INFO, uint(TIMESTAMP_SCALE, 1_000_000), string(MUXING_APP, "mkv_fixtures"), string(WRITING_APP, "mkv_fixtures"))
+        tracks = master(TRACKS, *(track.entry(number) for number, track in enumerate(self.tracks, 1)))
+        clusters = b"".join(master(CLUSTER, uint(TIMESTAMP, i * 1000)) for i in range(self.clusters))
+        # one cluster per event keeps the relative block timestamps at 0
+        blocks = sorted((start, end, number, data) for number, track in enumerate(self.tracks, 1) for start, end, data in track.events or ())
+        clusters += b"".join(
+            master(CLUSTER, uint(TIMESTAMP, start), master(BLOCK_GROUP, element(BLOCK, size_vint(number) + b"\x00\x00\x00" + data.encode("utf-8")), uint(BLOCK_DURATION, end - start)))
+            for start, end, number, data in blocks
+        )
+        void = element(VOID, bytes(16)) if self.void_before_tracks else b""
+        body = [info, void, clusters, tracks] if self.tracks_after_clusters else [info, void, tracks, clusters]
+
+        if self.seek_head:
+            # fixed width positions, so the size of the SeekHead doesn't depend on them
+            def _seek_head(info_position:int, tracks_position:int) -> bytes:
+                return master(
+                    SEEK_HEAD,
+                    master(SEEK, element(SEEK_ID, element_id(INFO)), uint(SEEK_POSITION, info_position, 8)),
+                    master(SEEK, element(SEEK_ID, element_id(TRACKS)), uint(SEEK_POSITION, tracks_position, 8)),
+                )
+            offset = len(_seek_head(0, 0))
+            positions = {}
+            for part in body:
+                positions[id(part)] = offset
+                offset += len(part)
+            body.insert(0, _seek_head(positions[id(info)], positions[id(tracks)]))
+
+        content = b"".join(body)
+        segment = element_id(SEGMENT) + (UNKNOWN_SIZE if self.unknown_segment_size else size_vint(len(content))) + content
+        return header + segment
+
+    def write(self, directory:Path) -> Path:
+        path = Path(directory) / f"{self.name}.mkv"
+        path.write_bytes(self.build())
+        return path
+
+
+def _ms(time:str) -> int:
+    hours, minutes, seconds = time.split(":")
+    return round((int(hours) * 3600 + int(minutes) * 60 + float(seconds)) * 1000)
+
+
+def ass_track(script:str, title:str|None=None, language:str|None="eng", is_default:bool|None=True) -> Track:
+    """
+    A S_TEXT/ASS track with the header and Dialogue lines of an ASS script, e.g. from corpus.py. Comments are dropped like mkvmerge does.
+    """
+    header, events = script.split("[Events]", 1)
+    format_line, *lines = events.strip().splitlines()
+    track_events = []
+    for read_order, line in enumerate(line for line in lines if line.startswith("Dialogue:")):
+        layer, start, end, style, name, margin_l, margin_r, margin_v, effect, text = line[len("Dialogue:"):].strip().split(",", 9)
+        track_events.append((_ms(start), _ms(end), ",".join((str(read_order), layer, style, name, margin_l, margin_r, margin_v, effect, text))))
+    return Track("sub", "S_TEXT/ASS", title, language, is_default=is_default, codec_private=f"{header}[Events]\n{format_line}\n", events=track_events)
+
+
+FIXTURES = [
+    Fixture(
+        "basic",
+        [
+            Track("video", "V_MS/VFW/FOURCC", language="und"),
+            Track("audio", "A_PCM/INT/LIT", "Japanese", "jpn", is_default=True),
+            Track("sub", "S_TEXT/ASS", "Full", "eng", is_default=True),
+            Track("sub", "S_TEXT/UTF8", "Signs", "ger", is_default=False, is_forced=True),
+        ],
+        notes="SeekHead, Tracks before the clusters",
+    ),
+    Fixture(
+        "tracks_after_clusters",
+        [
+            Track("video", "V_MS/VFW/FOURCC", "Video", "jpn", is_default=True),
+            Track("sub", "S_TEXT/ASS", "Dialogue", "por", "pt-BR", is_default=False),
+            Track("sub", "S_HDMV/PGS", None, "spa", "es-419", is_default=False),
+        ],
+        tracks_after_clusters=True,
+        notes="Tracks only reachable through the SeekHead",
+    ),
+    Fixture(
+        "defaults",
+        [
+            Track("video", "V_MS/VFW/FOURCC"),
+            Track("audio", "A_PCM/INT/LIT"),
+            Track("audio", "A_PCM/INT/LIT", "Commentary", "eng", is_default=False),
+            Track("sub", "S_TEXT/ASS"),
+        ],
+        seek_head=False,
+        unknown_segment_size=True,
+        void_before_tracks=True,
+        notes="no SeekHead, unknown segment size, Void element, flags and languages left to their defaults",
+    ),
+]
+
+
+def write_fixtures(directory:Path) -> dict[str, Path]:
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    return {fixture.name: fixture.write(directory) for fixture in FIXTURES}
@@ -0,0 +1,80 @@
+"""
+Checks the mkvmerge arguments `premux_args` builds for single episodes against the expected flags.
+The episodes are fixtures from mkv_fixtures.py, the video track is found by `read_matroska_tracks`, so nothing is probed or muxed.
+
+    python benchmarks/premux_check.py
+
+Exits with 1 if any argument list differs. Needs the package and its dependencies installed and mkvmerge in the PATH (it isn't run).
+"""
+import sys
+import tempfile
+from pathlib import Path
+from muxtools import SubTrack, Attachment
+from muxtools_helper_scripts.muxing import premux_args
+from mkv_fixtures import Fixture, Track
+
+
+EPISODE = Fixture(
+    "episode",
+    [
+        Track("sub", "S_TEXT/ASS", "Old", "eng"),
+        Track("video", "V_MS/VFW/FOURCC", "Main", "jpn"),
+        Track("audio", "A_PCM/INT/LIT", "Japanese", "jpn"),
+        Track("video", "V_MS/VFW/FOURCC", "Alternative", "jpn", is_default=False),
+    ],
+)
+
+
+def _video_flags(track_id:int, name:str="", lang:str="ja", default:str="yes", forced:str="no") -> list[str]:
+    return [
+        "--no-global-tags", "--no-chapters", "--no-subtitles", "--no-attachments", "--video-tracks", str(track_id),
+        "--default-track-flag", f"{track_id}:{default}", "--forced-display-flag", f"{track_id}:{forced}",
+        "--language", f"{track_id}:{lang}", "--track-name", f"{track_id}:{name}",
+    ]
+
+
+def cases(tmp:Path) -> list[tuple[str, list[str], list[str]]]:
+    episode = EPISODE.write(tmp).resolve()
+    output = (tmp / "out.mkv").resolve()
+    subtitle = tmp / "episode.ass"
+    subtitle.write_text("[Script Info]\nScriptType: v4.00+\n", encoding="utf-8")
+    font = tmp / "font.ttf"
+    font.write_bytes(b"")
+    full = SubTrack(subtitle, "Full", "de")
+    signs = SubTrack(subtitle, "Signs", "de", default=False, forced=True)
+    full_args = ["--no-global-tags", "--track-name", "0:Full", "--language", "0:de", "--default-track-flag", "0:yes", "--forced-display-flag", "0:no", str(subtitle.resolve())]
+    signs_args = ["--no-global-tags", "--track-name", "0:Signs", "--language", "0:de", "--default-track-flag", "0:no", "--forced-display-flag", "0:yes", str(subtitle.resolve())]
+    return [
+        (
+            "video only",
+            premux_args(episode, output),
+            ["-o", str(output)] + _video_flags(1) + ["--no-audio", str(episode)],
+        ),
+        (
+            "subtitles and fonts",
+            premux_args(episode, output, [full, signs, Attachment(font)], name="Video", lang="jpn"),
+            ["-o", str(output)] + _video_flags(1, "Video", "jpn") + ["--no-audio", str(episode)] + full_args + signs_args + Attachment(font).mkvmerge_args(),
+        ),
+        (
+            "second video, audio kept, extra args",
+            premux_args(episode, output, [full], video=1, default=False, forced=True, keep_audio=True, mkvmerge_args="--no-track-tags --sync 3:-50"),
+            ["-o", str(output)] + _video_flags(3, default="no", forced="yes") + ["--no-track-tags", "--sync", "3:-50", str(episode)] + full_args,
+        ),
+    ]
+
+
+def main() -> int:
+    problems = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, actual, expected in cases(Path(tmp)):
+            # the first argument is the mkvmerge executable
+            if Path(actual[0]).stem != "mkvmerge" or actual[1:] != expected:
+                problems += 1
+                print(f"{name}:\n  got      {actual[1:]}\n  expected {expected}")
+            else:
+                print(f"{name}: OK")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
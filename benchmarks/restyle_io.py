@@ -0,0 +1,66 @@
+"""
+Counts document parses and writes of restyle_cr and restyle_bd_dx with and without the fused mode
+and checks that both modes produce the same file.
+
+    python benchmarks/restyle_io.py [lines]
+
+Needs the package and its dependencies installed.
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+import ass
+import muxtools.subtitle.basesub as basesub
+from muxtools import SubFile
+from muxtools_helper_scripts import restyle_cr, restyle_bd_dx
+from corpus import cr_script, write_script
+
+
+counts = {"parse": 0, "write": 0}
+_parse = basesub.parseDoc
+_dump_file = ass.Document.dump_file
+
+
+def _counting_parse(*args, **kwargs):
+    counts["parse"] += 1
+    return _parse(*args, **kwargs)
+
+
+def _counting_dump_file(self, *args, **kwargs):
+    counts["write"] += 1
+    return _dump_file(self, *args, **kwargs)
+
+
+def run(func, content:str, workdir:Path, name:str, fused:bool) -> tuple[dict[str, int], float, bytes]:
+    file = write_script(workdir / f"{name}.ass", content)
+    subfile = SubFile(file)
+    counts.update(parse=0, write=0)
+    start = time.perf_counter()
+    func(subfile, fused=fused)
+    elapsed = time.perf_counter() - start
+    return dict(counts), elapsed, subfile.file.read_bytes()
+
+
+def main(lines:int=2000) -> int:
+    basesub.parseDoc = _counting_parse
+    ass.Document.dump_file = _counting_dump_file
+    content = cr_script(lines)
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # muxtools uses the cwd as workdir
+        for func in (restyle_cr, restyle_bd_dx):
+            chained, chained_time, chained_out = run(func, content, Path(tmp), f"{func.__name__}_chained", False)
+            fused, fused_time, fused_out = run(func, content, Path(tmp), f"{func.__name__}_fused", True)
+            identical = chained_out == fused_out
+            failed |= not identical
+            print(f"{func.__name__} ({lines} lines)")
+            print(f"  chained: {chained['parse']:3} parses {chained['write']:3} writes {chained_time * 1000:8.1f} ms")
+            print(f"  fused:   {fused['parse']:3} parses {fused['write']:3} writes {fused_time * 1000:8.1f} ms")
+            print(f"  identical output: {identical}")
+    return int(failed)
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,169 @@
+"""
+Times every line manipulator and the restyle flows on the synthetic corpus (see `corpus.SCRIPTS`) and measures their peak memory.
+Results can be saved as a named baseline and compared with it later, the comparison fails if a case got slower or uses more memory than the tolerance allows.
+
+    python benchmarks/suite.py [--lines N] [--tag-density X] [--only REGEX] [--save NAME] [--compare NAME] [--tolerance 0.25]
+
+Baselines are stored in benchmarks/baselines/ and only make sense on the machine they were recorded on.
+`fix_uncovered_glyphs` isn't covered because it needs font files.
+Needs the package and its dependencies installed.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from muxtools import SubFile
+from muxtools_helper_scripts.subtitle import (
+    LinePipeline, iter_events, line_matcher, remove_lines, credit_filter, remove_credits, unfuck_bd_dx, position_styles_to_tags,
+    strip_weird_unicode, unicode_normalizer, WEIRD_UNICODE_DELETE, WEIRD_UNICODE_REPLACE, BIDI_MARKS, FULLWIDTH_PUNCTUATION,
+    fix_missing_glyphs, replace_substr, replace_style, change_style_for_actor, trim_subs, swap_italic_tags, restyle_cr, restyle_bd_dx,
+)
+from muxtools_helper_scripts.utils import result_cache
+from corpus import SCRIPTS, write_script
+
+
+BASELINES = Path(__file__).parent / "baselines"
+
+# name -> function building the manipulator, called before every run so caches inside a manipulator start empty
+MANIPULATORS:dict[str, Callable[[], Callable]] = {
+    "remove_credits": lambda: remove_credits,
+    "credit_filter(ignore_case)": lambda: credit_filter(ignore_case=True),
+    "remove_lines(comments)": lambda: remove_lines(line_matcher(comments=True)),
+    "unfuck_bd_dx": lambda: unfuck_bd_dx,
+    "position_styles_to_tags(dict)": lambda: position_styles_to_tags({"top": r"\an8", "center": r"\an5"}),
+    "strip_weird_unicode": lambda: strip_weird_unicode,
+    "unicode_normalizer(NFKC)": lambda: unicode_normalizer(WEIRD_UNICODE_DELETE + BIDI_MARKS, WEIRD_UNICODE_REPLACE | FULLWIDTH_PUNCTUATION, "NFKC"),
+    "fix_missing_glyphs": lambda: fix_missing_glyphs,
+    "replace_substr": lambda: replace_substr("sensei", "Sensei"),
+    "replace_style": lambda: replace_style("Default", "Main"),
+    "change_style_for_actor": lambda: change_style_for_actor(["sign", "On-screen"], None, "Signs"),
+    "trim_subs": lambda: trim_subs(100, 20000),
+    "swap_italic_tags": lambda: swap_italic_tags(["Italics", "Narrator", "Romaji"]),
+    "pipeline": lambda: LinePipeline(
+        strip_weird_unicode, remove_credits, unfuck_bd_dx, change_style_for_actor(["sign", "On-screen"], None, "Signs"),
+        replace_substr("...", "…"), swap_italic_tags("italics"), fix_missing_glyphs,
+    ),
+}
+
+# name -> (function taking a SubFile, scripts it runs on)
+FLOWS:dict[str, tuple[Callable[[SubFile], SubFile], tuple[str, ...]]] = {
+    "restyle_cr": (lambda subfile: restyle_cr(subfile), ("cr", "signs", "karaoke")),
+    "restyle_cr(fused=False)": (lambda subfile: restyle_cr(subfile, fused=False), ("cr",)),
+    "restyle_bd_dx": (lambda subfile: restyle_bd_dx(subfile), ("bd_dx",)),
+}
+
+
+def _measure(setup:Callable[[], tuple], run:Callable, repeat:int) -> dict[str, float]:
+    """
+    Best wall time of `repeat` runs and the peak memory of one more run traced by tracemalloc, `setup` is called untimed before every run.
+    """
+    seconds = float("inf")
+    for _ in range(repeat):
+        args = setup()
+        gc.collect()
+        start = time.perf_counter()
+        run(*args)
+        seconds = min(seconds, time.perf_counter() - start)
+    args = setup()
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    run(*args)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return {"seconds": seconds, "peak_mib": peak / (1 << 20)}
+
+
+def run_suite(lines:int, tag_density:float|None, repeat:int, only:re.Pattern|None, workdir:Path) -> dict[str, dict[str, float]]:
+    results = {}
+    for script, generate in SCRIPTS.items():
+        content = generate(lines) if tag_density is None else generate(lines, tag_density=tag_density)
+        source = write_script(workdir / f"{script}.ass", content)
+        for name, build in MANIPULATORS.items():
+            case = f"{script}/{name}"
+            if only and not only.search(case):
+                continue
+            results[case] = _measure(lambda: (list(iter_events(source)), build()), lambda events, manipulator: manipulator(events), repeat)
+            print(f"{case:45} {results[case]['seconds'] * 1000:9.2f} ms {results[case]['peak_mib']:8.2f} MiB", flush=True)
+        for name, (flow, scripts) in FLOWS.items():
+            case = f"{script}/{name}"
+            if script not in scripts or (only and not only.search(case)):
+                continue
+            target = workdir / f"{script}_flow.ass"
+            results[case] = _measure(lambda: (SubFile(write_script(target, content)),), flow, repeat)
+            print(f"{case:45} {results[case]['seconds'] * 1000:9.2f} ms {results[case]['peak_mib']:8.2f} MiB", flush=True)
+    return results
+
+
+def compare(results:dict[str, dict[str, float]], baseline:dict[str, dict[str, float]], tolerance:float) -> list[str]:
+    """
+    Returns the regressed cases. Differences below 1 ms or 1 MiB are ignored as noise.
+    """
+    regressions = []
+    print(f"\n{'case':45} {'time':>10} {'memory':>10}")
+    for case, current in results.items():
+        if (old := baseline.get(case)) is None:
+            print(f"{case:45} {'new':>10}")
+            continue
+        time_ratio = current["seconds"] / old["seconds"] if old["seconds"] else 1.0
+        memory_ratio = current["peak_mib"] / old["peak_mib"] if old["peak_mib"] else 1.0
+        slower = time_ratio > 1 + tolerance and current["seconds"] - old["seconds"] > 0.001
+        larger = memory_ratio > 1 + tolerance and current["peak_mib"] - old["peak_mib"] > 1
+        marker = "  <- regression" if slower or larger else ""
+        print(f"{case:45} {time_ratio:9.2f}x {memory_ratio:9.2f}x{marker}")
+        if marker:
+            regressions.append(case)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=5000, help="events per script")
+    parser.add_argument("--tag-density", type=float, default=None, help="tag density of every script, see corpus.py. Defaults to the generator defaults.")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case, the best one counts")
+    parser.add_argument("--only", type=re.compile, default=None, help="regex selecting cases, e.g. 'cr/' or 'restyle'")
+    parser.add_argument("--save", metavar="NAME", help="store the results as a baseline")
+    parser.add_argument("--compare", metavar="NAME", help="compare the results with a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown or memory increase as a fraction")
+    args = parser.parse_args()
+
+    config = {"lines": args.lines, "tag_density": args.tag_density}
+    baseline = None
+    if args.compare:
+        baseline = json.loads((BASELINES / f"{args.compare}.json").read_text(encoding="utf-8"))
+        if baseline["config"] != config:
+            print(f"Baseline '{args.compare}' was recorded with {baseline['config']}, not {config}.")
+            return 2
+    # restyling the same content again would only measure the cache
+    result_cache.cache_dir = None
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)  # muxtools uses the cwd as workdir
+        try:
+            results = run_suite(args.lines, args.tag_density, args.repeat, args.only, Path(tmp))
+        finally:
+            os.chdir(cwd)
+    if args.save:
+        BASELINES.mkdir(exist_ok=True)
+        path = BASELINES / f"{args.save}.json"
+        meta = {"python": platform.python_version(), "platform": platform.platform(), "created": time.time()}
+        path.write_text(json.dumps({"config": config, "meta": meta, "results": results}, indent=2), encoding="utf-8")
+        print(f"Saved baseline to {path}")
+    if baseline is not None:
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.tolerance:.0%}.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Checks `watch_season` and `restyle_changed` with polling in a temp dir against episodes built by mkv_fixtures.py.
+
+    python benchmarks/watch_check.py
+
+Every step runs `watch_season(polling=True, max_runs=N)` and compares which episodes were restyled and which were skipped through the `SeasonManifest`:
+unchanged or only touched episodes are skipped, replaced or new episodes and a changed restyle config are redone.
+Exits with 1 if a step differs. Needs the package and its dependencies installed and mkvextract in the PATH.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from muxtools_helper_scripts.subtitle import restyle_cr, watch_season
+from corpus import cr_script
+from mkv_fixtures import Fixture, Track, ass_track
+
+
+def write_episode(directory:Path, name:str, seed:int) -> Path:
+    """
+    Writes an episode with an mtime older than the settle time, like a finished copy, so watch_season doesn't wait for it.
+    """
+    path = Fixture(name, [Track("video", "V_MS/VFW/FOURCC"), ass_track(cr_script(40, seed=seed), "Full")], clusters=0).write(directory)
+    settled = time.time() - 1
+    os.utime(path, (settled, settled))
+    return path
+
+
+def watch(episodes:Path, output:Path, options:dict|None=None, max_runs:int=1, during=None) -> list[dict[str, bool]]:
+    """
+    Runs watch_season and returns {episode name: skipped} for every run. `during` is started in a thread once the first run is done.
+    """
+    runs = []
+
+    def _on_results(results):
+        runs.append({result.file.name: result.skipped for result in results if result.ok})
+        if during is not None and len(runs) == 1:
+            threading.Thread(target=during).start()
+    watch_season(str(episodes / "*.mkv"), output, restyle_cr, options, interval=0.1, settle=0.2, on_results=_on_results, max_runs=max_runs, polling=True, restyle_workers=1)
+    return runs
+
+
+def main() -> int:
+    problems = 0
+
+    def _expect(step:str, runs:list[dict[str, bool]], expected:list[dict[str, bool]]) -> None:
+        nonlocal problems
+        if runs != expected:
+            problems += 1
+        print(f"{step:40} {'OK' if runs == expected else f'got {runs}, expected {expected}'}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        episodes, output = tmp / "episodes", tmp / "subs"
+        episodes.mkdir()
+        cwd = os.getcwd()
+        os.chdir(tmp)  # muxtools uses the cwd as workdir
+        try:
+            write_episode(episodes, "ep01", 1)
+            write_episode(episodes, "ep02", 2)
+            _expect("first run", watch(episodes, output), [{"ep01.mkv": False, "ep02.mkv": False}])
+            first = (output / "ep01.ass").read_bytes()
+            _expect("unchanged", watch(episodes, output), [{"ep01.mkv": True, "ep02.mkv": True}])
+
+            stat = (episodes / "ep01.mkv").stat()
+            os.utime(episodes / "ep01.mkv", ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**10))
+            _expect("touched, same content", watch(episodes, output), [{"ep01.mkv": True, "ep02.mkv": True}])
+
+            write_episode(episodes, "ep01", 3)
+            _expect("replaced", watch(episodes, output), [{"ep01.mkv": False, "ep02.mkv": True}])
+            if (output / "ep01.ass").read_bytes() == first:
+                problems += 1
+                print("replaced episode kept the old output")
+
+            _expect("changed config", watch(episodes, output, {"purge_macrons": False}), [{"ep01.mkv": False, "ep02.mkv": False}])
+
+            _expect(
+                "new episode while watching",
+                watch(episodes, output, {"purge_macrons": False}, max_runs=2, during=lambda: write_episode(episodes, "ep03", 4)),
+                [{"ep01.mkv": True, "ep02.mkv": True}, {"ep03.mkv": False}],
+            )
+        finally:
+            os.chdir(cwd)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,12 @@
-from .muxing import *
-from .subtitle import *
+from ._lazy import attach
+# the subpackages only set up their lazy exports, importing them doesn't import muxtools
+from . import muxing, subtitle, utils
 
-__all__ = ["restyle_cr", "restyle_bd_dx"]
\ No newline at end of file
+# everything is imported on first use, see _lazy.attach
+# typing isn't imported here on purpose, it alone takes longer than the rest of this file
+__getattr__, __dir__, _ = attach(__name__, {
+    "muxing": muxing.__all__,
+    "subtitle": subtitle.__all__,
+    "utils": utils.__all__,
+})
+__all__ = ["restyle_cr", "restyle_bd_dx"]
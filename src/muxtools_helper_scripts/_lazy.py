@@ -0,0 +1,31 @@
+from __future__ import annotations
+import sys
+from importlib import import_module
+
+# typing and collections.abc take longer to import than the whole package, they're only needed for the annotations
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any
+
+
+def attach(package:str, submodules:dict[str, list[str]]) -> tuple[Callable[[str], Any], Callable[[], list[str]], list[str]]:
+    """
+    Lazy exports for a package, returns its `__getattr__`, `__dir__` and `__all__`.
+
+    A name is imported from its submodule on first access and then stored in the package, so later lookups are plain attribute access.
+    Keeps `import muxtools_helper_scripts` from importing muxtools and every other dependency up front.
+    """
+    exports = {name: module for module, names in submodules.items() for name in names}
+
+    def __getattr__(name:str) -> Any:
+        if (module := exports.get(name)) is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(import_module(f".{module}", package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(sys.modules[package])) | exports.keys())
+
+    return __getattr__, __dir__, list(exports)
@@ -1 +1,6 @@
-from .tracks import *
\ No newline at end of file
+from .._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "premux": ["PremuxResult", "premux_args", "premux_season"],
+    "tracks": ["video_track2"],
+})
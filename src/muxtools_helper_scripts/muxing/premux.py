@@ -0,0 +1,171 @@
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from shlex import split as split_args
+from muxtools import GlobSearch, PathLike, TrackType, ensure_path_exists, get_executable, get_workdir, run_commandline, error, warn
+from muxtools.muxing.tracks import _track
+from ..subtitle.batch import _season_files
+from ..utils.matroska import MatroskaError, read_matroska_tracks
+from ..utils.probe import cached_probe
+from ..utils.trace import traced
+
+
+__all__ = ["PremuxResult", "premux_args", "premux_season"]
+
+
+@dataclass
+class PremuxResult:
+    """
+    Result of a single episode of `premux_season`.
+    """
+    file: Path
+    output: Path | None = None
+    """The muxed file, None if muxing failed or the episode was skipped."""
+    error: Exception | None = None
+    skipped: bool = False
+    """True if there were no tracks for the episode (None)."""
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _video_track_id(file:Path, video:int, caller:str) -> int:
+    try:
+        parsed = read_matroska_tracks(file, caller)
+    except MatroskaError:
+        parsed = cached_probe(file, caller)
+    return parsed.find_tracks(relative_id=video, type=TrackType.VIDEO, error_if_empty=True, caller=caller)[0].index
+
+
+def premux_args(
+    file:PathLike,
+    output:PathLike,
+    tracks:Sequence[_track]=(),
+    video:int=0,
+    name:str="",
+    lang:str="ja",
+    default:bool=True,
+    forced:bool=False,
+    keep_audio:bool=False,
+    mkvmerge_args:str|list[str]="",
+) -> list[str]:
+    """
+    Builds the mkvmerge command that copies one video track of `file` (like `video_track2`) and adds `tracks` in the same pass.
+
+    Args:
+        file (PathLike): The episode.
+        output (PathLike): The muxed file.
+        tracks (Sequence[_track]): muxtools tracks added after the video, e.g. `subfile.to_track("Full", "de")`, `muxtools.SubTrack`, `AudioTrack` or `Attachment`. Their flags are used as they are.
+        video (int): Relative index of the video track.
+        name, lang, default, forced: Track name, language and flags of the video track.
+        keep_audio (bool): Also copy the audio tracks of `file`.
+        mkvmerge_args (str | list[str]): Additional arguments for `file`.
+    """
+    caller = "premux_args"
+    file = ensure_path_exists(file, caller)
+    track_id = _video_track_id(file, video, caller)
+    args = [
+        get_executable("mkvmerge"), "-o", str(Path(output).resolve()),
+        "--no-global-tags", "--no-chapters", "--no-subtitles", "--no-attachments", "--video-tracks", str(track_id),
+        "--default-track-flag", f"{track_id}:{'yes' if default else 'no'}",
+        "--forced-display-flag", f"{track_id}:{'yes' if forced else 'no'}",
+        "--language", f"{track_id}:{lang}",
+        "--track-name", f"{track_id}:{name}",
+    ]
+    if not keep_audio:
+        args.append("--no-audio")
+    args.extend(split_args(mkvmerge_args) if isinstance(mkvmerge_args, str) else mkvmerge_args)
+    args.append(str(file.resolve()))
+    for track in tracks:
+        args.extend(track.mkvmerge_args())
+    return args
+
+
+def _premux(file:Path, output:Path, tracks:Sequence[_track], options:dict, quiet:bool) -> Path:
+    # mkvmerge exits with 1 on warnings
+    if run_commandline(premux_args(file, output, tracks, **options), quiet, mkvmerge=True) > 1:
+        raise error(f"Failed to mux '{file.name}'.", "premux_season")
+    return output
+
+
+@traced()
+def premux_season(
+    files:PathLike|GlobSearch|Sequence[PathLike],
+    tracks:Sequence[Sequence[_track]|None]|Callable[[Path], Sequence[_track]|None],
+    output_dir:PathLike|None=None,
+    video:int=0,
+    name:str="",
+    lang:str="ja",
+    default:bool=True,
+    forced:bool=False,
+    keep_audio:bool=False,
+    mkvmerge_args:str|list[str]="",
+    workers:int=2,
+    quiet:bool=True,
+) -> list[PremuxResult]:
+    """
+    Muxes the video of every episode together with its new tracks using one mkvmerge call per episode,
+    instead of a `video_track2` premux followed by another mux that writes the video again.
+
+    Episodes are muxed concurrently by up to `workers` mkvmerge processes. Muxing is mostly I/O bound, more workers than disks rarely help.
+    A failing episode doesn't stop the others, its error is in the result and logged as a warning.
+    Episodes whose tracks are None are skipped, e.g. because restyling them failed.
+
+    Example usage:
+        ```py
+        results = restyle_season("*.mkv", restyle_cr, track=dict(lang="de"))
+        premuxed = premux_season(
+            [result.file for result in results],
+            [[result.subfile.to_track("Full", "de")] if result.ok else None for result in results],
+            output_dir="premux",
+        )
+        ```
+
+    Args:
+        files (PathLike | GlobSearch | Sequence[PathLike]): The episodes. A string with glob characters is searched recursively from the cwd, matches are sorted by path.
+        tracks (Sequence[Sequence[_track] | None] | Callable[[Path], Sequence[_track] | None]): The tracks of every episode in the order of `files`, or a function returning them for an episode. None skips the episode.
+            Any muxtools track works, e.g. `subfile.to_track(...)`, `muxtools.SubTrack`, `AudioTrack` or `Attachment` for fonts.
+        output_dir (PathLike | None): Directory of the muxed files, named like the episodes. Defaults to the workdir.
+        video, name, lang, default, forced, keep_audio, mkvmerge_args: See `premux_args`.
+        workers (int): Number of episodes muxed at the same time.
+        quiet (bool): Hide the mkvmerge output unless it fails.
+
+    Returns:
+        list[PremuxResult]: One result per file in input order.
+    """
+    files = _season_files(files)
+    if not callable(tracks) and len(tracks) != len(files):
+        raise error(f"Got tracks for {len(tracks)} episodes but {len(files)} files.", "premux_season")
+    output_dir = Path(output_dir) if output_dir else Path(get_workdir())
+    output_dir.mkdir(parents=True, exist_ok=True)
+    options = dict(video=video, name=name, lang=lang, default=default, forced=forced, keep_audio=keep_audio, mkvmerge_args=mkvmerge_args)
+    results = [PremuxResult(file) for file in files]
+    if not files:
+        return results
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        futures = {}
+        for i, file in enumerate(files):
+            output = output_dir / f"{file.stem}.mkv"
+            if output.resolve() == file.resolve():
+                results[i].error = error(f"Output would overwrite '{file.name}', use another output_dir.", "premux_season")
+                continue
+            try:
+                episode_tracks = tracks(file) if callable(tracks) else tracks[i]
+            except Exception as e:
+                results[i].error = e
+                warn(f"Getting the tracks of '{file.name}' failed: {e}", "premux_season")
+                continue
+            if episode_tracks is None:
+                results[i].skipped = True
+                continue
+            futures[pool.submit(_premux, file, output, episode_tracks, options, quiet)] = i
+        for future in as_completed(futures):
+            i = futures[future]
+            if (exception := future.exception()) is not None:
+                results[i].error = exception
+                warn(f"Muxing '{files[i].name}' failed: {exception}", "premux_season")
+            else:
+                results[i].output = future.result()
+    return results
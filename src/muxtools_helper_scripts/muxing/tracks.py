@@ -1,9 +1,11 @@
 from muxtools import GlobSearch, PathLike, Premux
+from ..utils.trace import traced
 
 
 __all__ = ["video_track2"]
 
 
+@traced()
 def video_track2(file:PathLike|GlobSearch, name:str="", lang:str="ja", default:bool=True, forced:bool=False) -> Premux:
     """
     There seems to be no easy way to get just the videotrack of a file.
@@ -1,5 +1,23 @@
-from .line_manipulators import *
-from .presets import *
-from .restyle import *
-from .style import *
-from .sub import *
+from .._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "batch": ["EpisodeResult", "restyle_season"],
+    "compact": ["CompactLine", "to_compact", "from_compact", "read_compact"],
+    "document": ["single_parse"],
+    "fonts": ["FontCoverage"],
+    "line_manipulators": [
+        "CREDIT_KEYWORDS", "BD_DX_POSITION_STYLES", "line_matcher", "remove_lines", "position_styles_to_tags", "unfuck_bd_dx", "credit_filter", "remove_credits",
+        "WEIRD_UNICODE_DELETE", "WEIRD_UNICODE_REPLACE", "BIDI_MARKS", "ZERO_WIDTH", "FULLWIDTH_PUNCTUATION", "unicode_normalizer", "strip_weird_unicode",
+        "replace_fonts_for_glyphs", "replace_font_for_glyphs", "MISSING_GLYPH_FONTS", "fix_missing_glyphs", "FALLBACK_FONTS", "fix_uncovered_glyphs",
+        "replace_substr", "replace_style", "change_style_for_actor", "trim_subs", "swap_italic_tags",
+    ],
+    "pipeline": ["per_line", "LinePipeline"],
+    "presets": ["GANDHI_PRESET", "GANDHI_UW_PRESET", "SIGNS_PRESET", "NOTO_PRESET", "JPN_PRESET", "KOR_PRESET", "SC_PRESET", "TC_PRESET", "THAI_PRESET", "ARAB_PRESET", "register_preset", "get_preset", "preset_names"],
+    "restyle": ["restyle_cr", "restyle_bd_dx"],
+    "style": ["StyleIndex", "get_style"],
+    "stream": ["iter_events", "stream_lines"],
+    "sub": ["get_sub_track", "all_subs_from_mkv", "LazySubTrack", "lazy_subs_from_mkv", "load_sub_tracks"],
+    "tags": ["line_tags", "set_line_tags"],
+    "timing": ["LineTimes", "frame_to_time", "keep_ranges", "shift_lines", "cut_frames"],
+    "watch": ["SeasonManifest", "restyle_changed", "watch_season"],
+})
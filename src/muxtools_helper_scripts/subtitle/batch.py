@@ -0,0 +1,147 @@
+import multiprocessing
+import os
+import sys
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from muxtools import GlobSearch, PathLike, SubFile, warn
+from .restyle import restyle_cr
+from .sub import get_sub_track
+
+
+__all__ = ["EpisodeResult", "restyle_season"]
+
+
+@dataclass
+class EpisodeResult:
+    """
+    Result of a single episode of `restyle_season`.
+    """
+    file: Path
+    subfile: SubFile | None = None
+    """The restyled subtitle file, None if a step failed."""
+    error: Exception | None = None
+    skipped: bool = False
+    """True if the output of an earlier run was reused, see `restyle_changed`."""
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _has_glob(pattern:str) -> bool:
+    return any(char in pattern for char in "*?[")
+
+
+def _glob_root(pattern:str) -> tuple[Path, str]:
+    """
+    Splits a glob pattern into the directory to search in and a relative pattern, pathlib can't glob absolute patterns.
+    Relative patterns are searched from the cwd.
+    """
+    path = Path(pattern)
+    if not path.is_absolute():
+        return Path.cwd(), pattern
+    parts = path.parts
+    first = next(i for i, part in enumerate(parts) if _has_glob(part))
+    return Path(*parts[:first]), str(Path(*parts[first:]))
+
+
+def _season_files(files:PathLike|GlobSearch|Sequence[PathLike]) -> list[Path]:
+    if isinstance(files, GlobSearch):
+        return sorted(files.paths)
+    if isinstance(files, str) and _has_glob(files):
+        root, pattern = _glob_root(files)
+        return sorted(GlobSearch(pattern, allow_multiple=True, dir=root).paths)
+    if isinstance(files, (str, os.PathLike)):
+        return [Path(files)]
+    return [Path(file) for file in files]
+
+
+def _process_context() -> multiprocessing.context.BaseContext:
+    """
+    fork where it's safe, so scripts without a __main__ guard work. The default changed to forkserver on Linux with Python 3.14.
+    macOS (fork breaks system libraries there) and Windows use spawn, which imports the script again in every worker.
+    """
+    if sys.platform != "darwin" and "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+
+def _restyle(restyle:Callable[..., SubFile], subfile:SubFile, options:dict[str, Any]) -> SubFile:
+    # top level so it can run in a worker process
+    return restyle(subfile, **options)
+
+
+def restyle_season(
+    files:PathLike|GlobSearch|Sequence[PathLike],
+    restyle:Callable[..., SubFile]=restyle_cr,
+    options:dict[str, Any]|None=None,
+    track:dict[str, Any]|None=None,
+    extract_workers:int=4,
+    restyle_workers:int|None=None,
+) -> list[EpisodeResult]:
+    """
+    Extracts a subtitle track of every episode with `get_sub_track` and restyles it.
+
+    Extraction is I/O-bound and runs in a thread pool, restyling runs in a process pool.
+    An episode is restyled as soon as its extraction is done, so both pools work at the same time.
+    A failing episode doesn't stop the others, its error is in the result and logged as a warning.
+
+    Example usage:
+        ```py
+        results = restyle_season("*.mkv", restyle_cr, options=dict(purge_macrons=False), track=dict(lang="de"))
+        subs = [result.subfile for result in results if result.ok]
+        ```
+
+    Args:
+        files (PathLike | GlobSearch | Sequence[PathLike]): The episodes. A string with glob characters is searched recursively from the cwd, matches are sorted by path.
+            Absolute patterns like "/media/show/*.mkv" are searched from their last directory before the first glob character.
+        restyle (Callable[..., SubFile]): Called with the extracted SubFile and `options`, e.g. `restyle_cr` or `restyle_bd_dx`. Has to be picklable (a module level function) if restyle_workers > 1.
+        options (dict[str, Any] | None): Keyword arguments for `restyle`.
+        track (dict[str, Any] | None): Keyword arguments for `get_sub_track`, e.g. name or lang.
+        extract_workers (int): Number of threads extracting tracks.
+        restyle_workers (int | None): Number of processes restyling. None uses the number of CPUs, 1 or less restyles in this process.
+            The workers are forked on Linux. On Windows and macOS they are spawned, which runs the script again in every worker,
+            so the script has to call `restyle_season` under an `if __name__ == "__main__":` guard there.
+
+    Returns:
+        list[EpisodeResult]: One result per file in input order.
+    """
+    files = _season_files(files)
+    options = options or {}
+    track = track or {}
+    restyle_workers = (os.cpu_count() or 1) if restyle_workers is None else restyle_workers
+    results = [EpisodeResult(file) for file in files]
+    if not files:
+        return results
+
+    def _failed(i:int, step:str, exception:Exception) -> None:
+        results[i].error = exception
+        warn(f"{step} of '{files[i].name}' failed: {exception}", "restyle_season")
+
+    if restyle_workers > 1:
+        context = _process_context()
+        restylers = ProcessPoolExecutor(max_workers=min(restyle_workers, len(files)), mp_context=context)
+        if context.get_start_method() == "fork":
+            # the first task forks every worker, this has to happen before the extraction threads exist
+            # because forking a multi-threaded process can deadlock
+            restylers.submit(int).result()
+    else:
+        restylers = ThreadPoolExecutor(max_workers=1)
+    with ThreadPoolExecutor(max_workers=max(extract_workers, 1)) as extractors, restylers:
+        extracted = {extractors.submit(get_sub_track, file, **track): i for i, file in enumerate(files)}
+        restyled = dict[int, Future]()
+        for future in as_completed(extracted):
+            i = extracted[future]
+            if (exception := future.exception()) is not None:
+                _failed(i, "Extraction", exception)
+            else:
+                restyled[i] = restylers.submit(_restyle, restyle, future.result(), options)
+        for i, future in restyled.items():
+            if (exception := future.exception()) is not None:
+                _failed(i, "Restyling", exception)
+            else:
+                results[i].subfile = future.result()
+    return results
@@ -0,0 +1,81 @@
+import sys
+from collections.abc import Iterable
+from datetime import timedelta
+from typing import Any
+from muxtools import PathLike
+from muxtools.subtitle.sub import LINES
+from muxtools.subtitle.basesub import _Line
+from ass.section import EventsSection
+from .stream import iter_events
+
+
+__all__ = ["CompactLine", "to_compact", "from_compact", "read_compact"]
+
+
+# ass field name -> attribute, in the default field order
+_FIELDS = {"Layer": "layer", "Start": "start", "End": "end", "Style": "style", "Name": "name", "MarginL": "margin_l", "MarginR": "margin_r", "MarginV": "margin_v", "Effect": "effect", "Text": "text"}
+
+
+class CompactLine:
+    """
+    An event with the same attributes as an `ass` line (`layer`, `start`, `end`, `style`, `name`, `margin_l`, `margin_r`, `margin_v`, `effect`, `text` and `TYPE`),
+    stored in slots instead of an instance dict plus a field dict. Style, actor and effect names are interned, so every line using a style shares one string.
+
+    Every manipulator in `line_manipulators` works on lists of them.
+    Converts losslessly to and from `ass` lines, fields outside the standard ones are kept in `extra`.
+    """
+    __slots__ = ("TYPE", "layer", "start", "end", "style", "name", "margin_l", "margin_r", "margin_v", "effect", "text", "extra", "__weakref__")
+
+    def __init__(self, TYPE:str, layer:int, start:timedelta, end:timedelta, style:str, name:str, margin_l:int, margin_r:int, margin_v:int, effect:str, text:str, extra:dict[str, Any]|None=None):
+        self.TYPE = TYPE
+        self.layer = layer
+        self.start = start
+        self.end = end
+        self.style = sys.intern(style)
+        self.name = sys.intern(name)
+        self.margin_l = margin_l
+        self.margin_r = margin_r
+        self.margin_v = margin_v
+        self.effect = sys.intern(effect)
+        self.text = text
+        self.extra = extra
+
+    @classmethod
+    def from_line(cls, line:_Line) -> "CompactLine":
+        fields = line.fields
+        extra = {key: value for key, value in fields.items() if key not in _FIELDS} if len(fields) != len(_FIELDS) else None
+        return cls(line.TYPE, *(fields[field] for field in _FIELDS), extra=extra or None)
+
+    def to_line(self) -> _Line:
+        line = EventsSection.line_parsers[self.TYPE.lower()](type_name=self.TYPE)
+        line.fields = {field: getattr(self, attribute) for field, attribute in _FIELDS.items()}
+        if self.extra:
+            line.fields.update(self.extra)
+        return line
+
+    def dump_with_type(self, field_order:list[str]|None=None) -> str:
+        return self.to_line().dump_with_type(field_order)
+
+    def __repr__(self) -> str:
+        return f"CompactLine({self.TYPE}, " + ", ".join(f"{attribute}={getattr(self, attribute)!r}" for attribute in _FIELDS.values()) + ")"
+
+
+def to_compact(lines:Iterable[_Line]) -> list[CompactLine]:
+    """
+    Converts `ass` lines, e.g. `doc.events`, to compact lines.
+    """
+    return [CompactLine.from_line(line) for line in lines]
+
+
+def from_compact(lines:Iterable[CompactLine]) -> LINES:
+    """
+    Converts compact lines back to `ass` lines, e.g. to return them from a function passed to .manipulate_lines().
+    """
+    return [line.to_line() for line in lines]
+
+
+def read_compact(file:PathLike, encoding:str="utf_8_sig") -> list[CompactLine]:
+    """
+    Reads the events of an ASS file straight into compact lines, without ever holding the whole parsed document.
+    """
+    return to_compact(iter_events(file, encoding))
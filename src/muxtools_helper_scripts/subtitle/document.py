@@ -0,0 +1,105 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import wraps
+from muxtools import SubFile, PathLike
+from ass import Document
+from ass.data import _Field
+from ass.section import ScriptInfoSection
+
+
+__all__ = ["single_parse"]
+
+
+def _normalize_doc(doc:Document) -> None:
+    """
+    Applies the changes that writing a document and parsing it again would do.
+    Parsing strips every line, so the last event field loses trailing whitespace and header values lose surrounding whitespace.
+    Times are stored in centiseconds.
+    """
+    for key, value in doc.info.items():
+        if isinstance(value, str):
+            stripped = value.strip()
+            if key in ScriptInfoSection.FIELDS:
+                doc.info[key] = ScriptInfoSection.FIELDS[key].parse(stripped)
+            elif stripped != value:
+                doc.info[key] = stripped
+    field_order = doc.events.field_order or ()
+    last_field = field_order[-1] if field_order else None
+    for line in doc.events:
+        fields = line.fields
+        value = fields.get(last_field)
+        if isinstance(value, str) and value[-1:].isspace():
+            fields[last_field] = value.rstrip()
+        for time in ("Start", "End"):
+            value = fields.get(time)
+            if value is not None and value.microseconds % 10000:
+                fields[time] = _Field.timedelta_from_ass(_Field.timedelta_to_ass(value))
+
+
+@contextmanager
+def single_parse(subfile:SubFile) -> Iterator[SubFile]:
+    """
+    Keeps the parsed document of a SubFile in memory while the context is active.
+
+    Every SubFile method (and `get_style`) used inside the context works on the same document instead of re-reading and re-writing the file.
+    `resample` runs aegisub-cli on the file, so the document is written before and parsed again after it.
+    The file is parsed once on enter and written once on exit. Nothing is written if an exception is raised inside the context.
+    Every in-memory write normalizes the document like a write and re-read would, so the result matches running the steps on the file.
+    Nesting is allowed, only the outermost context reads and writes the file.
+
+    Example usage:
+        ```py
+        with single_parse(subfile):
+            subfile.set_headers(...).manipulate_lines(...).restyle(...)
+        ```
+
+    Args:
+        subfile (SubFile): The subtitle file to keep in memory.
+
+    Yields:
+        SubFile: The same subtitle file.
+    """
+    if "_read_doc" in vars(subfile):
+        # already inside a single_parse context
+        yield subfile
+        return
+
+    read_doc = subfile._read_doc
+    update_doc = subfile._update_doc
+    resample = subfile.resample
+    doc = read_doc()
+    modified = False
+
+    def _read_doc(file:PathLike|None=None) -> Document:
+        if file is not None and file != subfile.file:
+            return read_doc(file)
+        return doc
+
+    def _update_doc(new_doc:Document) -> None:
+        nonlocal doc, modified
+        _normalize_doc(new_doc)
+        doc = new_doc
+        modified = True
+
+    @wraps(resample)
+    def _resample(*args, **kwargs) -> SubFile:
+        nonlocal doc, modified
+        if modified:
+            update_doc(doc)
+            modified = False
+        try:
+            return resample(*args, **kwargs)
+        finally:
+            doc = read_doc()
+
+    subfile._read_doc = _read_doc
+    subfile._update_doc = _update_doc
+    subfile.resample = _resample
+    try:
+        yield subfile
+    finally:
+        del subfile._read_doc
+        del subfile._update_doc
+        del subfile.resample
+    if modified:
+        update_doc(doc)
@@ -0,0 +1,182 @@
+import json
+from importlib.util import find_spec
+from collections.abc import Iterable
+from pathlib import Path
+from muxtools import PathLike, warn
+from ..utils.results import file_digest, file_stamp
+
+
+__all__ = ["FontCoverage"]
+
+
+FONT_SUFFIXES = (".ttf", ".otf", ".ttc", ".otc")
+# family, full name, postscript name and typographic family, the names libass matches \fn against
+_NAME_IDS = (1, 4, 6, 16)
+
+
+def _to_ranges(codepoints:Iterable[int]) -> list[list[int]]:
+    ranges = []
+    for codepoint in sorted(codepoints):
+        if ranges and ranges[-1][1] == codepoint - 1:
+            ranges[-1][1] = codepoint
+        else:
+            ranges.append([codepoint, codepoint])
+    return ranges
+
+
+def _from_ranges(ranges:list[list[int]]) -> set[int]:
+    codepoints = set[int]()
+    for start, end in ranges:
+        codepoints.update(range(start, end + 1))
+    return codepoints
+
+
+def _read_faces(file:Path) -> list[dict]:
+    """
+    Reads the names and the cmap of every face in a font file.
+    """
+    from fontTools.ttLib import TTCollection, TTFont
+    if file.suffix.lower() in (".ttc", ".otc"):
+        fonts = TTCollection(file, lazy=True).fonts
+    else:
+        fonts = [TTFont(file, lazy=True)]
+    faces = []
+    for font in fonts:
+        names = sorted({name.toUnicode().strip() for name in font["name"].names if name.nameID in _NAME_IDS} - {""})
+        cmap = font.getBestCmap() or {}
+        faces.append({"names": names, "ranges": _to_ranges(cmap)})
+    return faces
+
+
+class FontCoverage:
+    """
+    Index of the characters every local font covers, built from the cmap tables of font files.
+
+    Each font file is read once, its coverage is stored in `cache_dir` keyed by the SHA-256 of the file,
+    so building the index again for the next episode or run only reads small JSON files. Unchanged files aren't even hashed again.
+    Fonts are looked up by family, full or postscript name (caseinsensitive), every face of a family adds to its coverage.
+    Checking a character is a set lookup.
+
+    Needs `fontTools`, which is only imported when a font file has to be read.
+
+    Example usage:
+        ```py
+        coverage = FontCoverage("fonts", cache_dir=".cache/fonts")
+        coverage.missing("Gandhi Sans", "♪ Ｈｅｌｌｏ ♪")
+        ```
+
+    Args:
+        paths (PathLike | Iterable[PathLike]): Font files or directories searched recursively for .ttf, .otf, .ttc and .otc files.
+        cache_dir (PathLike | None): Directory of the coverage cache. Set to None to read every font file.
+    """
+    def __init__(self, paths:PathLike|Iterable[PathLike]=(), cache_dir:PathLike|None=None):
+        if find_spec("fontTools") is None:
+            raise ImportError("FontCoverage needs fontTools, install it with 'pip install fonttools'.")
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._fonts = dict[str, frozenset[int]]()
+        self._names = dict[str, str]()
+        self.add(paths)
+
+    def _stamps(self) -> dict[str, str]:
+        try:
+            return json.loads((self.cache_dir / "stamps.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, path:Path, content:object) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(content), encoding="utf-8")
+            tmp.replace(path)
+        except OSError as e:
+            warn(f"Could not write font coverage cache: {e}", self)
+
+    def _faces(self, file:Path, stamps:dict[str, str]) -> list[dict]:
+        if self.cache_dir is None:
+            return _read_faces(file)
+        stamp = file_stamp(file)
+        digest = stamps.get(stamp) or file_digest(file)
+        cached = self.cache_dir / f"{digest}.json"
+        try:
+            faces = json.loads(cached.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            faces = _read_faces(file)
+            self._write(cached, faces)
+        stamps[stamp] = digest
+        return faces
+
+    def add(self, paths:PathLike|Iterable[PathLike]) -> "FontCoverage":
+        """
+        Adds font files or directories to the index. Files that can't be read as a font are skipped with a warning.
+        """
+        if isinstance(paths, (str, Path)):
+            paths = [paths]
+        files = []
+        for path in map(Path, paths):
+            if path.is_dir():
+                files.extend(sorted(file for file in path.rglob("*") if file.suffix.lower() in FONT_SUFFIXES))
+            else:
+                files.append(path)
+        stamps = self._stamps() if self.cache_dir is not None else {}
+        known = len(stamps)
+        coverage = dict[str, set[int]]()
+        for file in files:
+            try:
+                faces = self._faces(file, stamps)
+            except Exception as e:
+                warn(f"Could not read font '{file.name}': {e}", self)
+                continue
+            for face in faces:
+                codepoints = _from_ranges(face["ranges"])
+                for name in face["names"]:
+                    key = name.casefold()
+                    self._names.setdefault(key, name)
+                    coverage.setdefault(key, set(self._fonts.get(key, ()))).update(codepoints)
+        self._fonts.update((key, frozenset(codepoints)) for key, codepoints in coverage.items())
+        if self.cache_dir is not None and len(stamps) != known:
+            self._write(self.cache_dir / "stamps.json", stamps)
+        return self
+
+    def __contains__(self, font:str) -> bool:
+        return font.casefold() in self._fonts
+
+    def __len__(self) -> int:
+        return len(self._fonts)
+
+    def names(self) -> list[str]:
+        return sorted(self._names.values())
+
+    def codepoints(self, font:str) -> frozenset[int]|None:
+        """
+        Returns every codepoint the font covers or None if it's not indexed.
+        """
+        return self._fonts.get(font.casefold())
+
+    def covers(self, font:str, char:str) -> bool|None:
+        """
+        Whether the font has a glyph for the character, None if the font is not indexed.
+        """
+        codepoints = self._fonts.get(font.casefold())
+        return None if codepoints is None else ord(char) in codepoints
+
+    def missing(self, font:str, text:str) -> set[str]:
+        """
+        Returns the characters of `text` the font doesn't cover. Whitespace and control characters are ignored.
+
+        Raises:
+            KeyError: If the font is not indexed.
+        """
+        codepoints = self._fonts[font.casefold()]
+        return {char for char in set(text) if ord(char) not in codepoints and not char.isspace() and char.isprintable()}
+
+    def fallback(self, char:str, fonts:Iterable[str]) -> str|None:
+        """
+        Returns the first of `fonts` that covers the character or None.
+        """
+        codepoint = ord(char)
+        for font in fonts:
+            codepoints = self._fonts.get(font.casefold())
+            if codepoints is not None and codepoint in codepoints:
+                return font
+        return None
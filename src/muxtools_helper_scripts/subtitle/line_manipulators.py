@@ -3,110 +3,434 @@ from datetime import timedelta
 from fractions import Fraction
 from muxtools.subtitle.sub import LINES
 from muxtools.subtitle.basesub import _Line
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 import re
-from ass_tag_analyzer import parse_line, ass_item_to_text, AssValidTagItalic
+import unicodedata
+from typing import Literal
+from ass_tag_analyzer import AssValidTagItalic
+from .pipeline import per_line
+from .tags import line_tags, set_line_tags
+from .timing import frame_to_time
+from .fonts import FontCoverage
+from ..utils.trace import traced_factory, traced_manipulator
 
 
-__all__ = ["unfuck_bd_dx", "remove_credits", "strip_weird_unicode", "replace_font_for_glyphs", "fix_missing_glyphs", "replace_substr", "replace_style", "change_style_for_actor", "trim_subs", "swap_italic_tags"]
+__all__ = ["CREDIT_KEYWORDS", "BD_DX_POSITION_STYLES", "line_matcher", "remove_lines", "position_styles_to_tags", "unfuck_bd_dx", "credit_filter", "remove_credits", "WEIRD_UNICODE_DELETE", "WEIRD_UNICODE_REPLACE", "BIDI_MARKS", "ZERO_WIDTH", "FULLWIDTH_PUNCTUATION", "unicode_normalizer", "strip_weird_unicode", "replace_fonts_for_glyphs", "replace_font_for_glyphs", "MISSING_GLYPH_FONTS", "fix_missing_glyphs", "FALLBACK_FONTS", "fix_uncovered_glyphs", "replace_substr", "replace_style", "change_style_for_actor", "trim_subs", "swap_italic_tags"]
 
 
-def _replace_style_with_tag(line:_Line, style:str, tag:str, exact:bool, default_style:str="Default") -> None:
+def _filter_lines(lines:LINES, remove:Callable[[_Line], bool]) -> LINES:
     """
-    Prepends a formatting tag to the text of a line when its style matches the given style criteria, then resets the line's style to a default value.
-    
+    Removes every line for which `remove` returns True in a single pass.
+    The order of the remaining lines is kept and the list is edited in place, so callers holding it see the result.
+    """
+    lines[:] = [line for line in lines if not remove(line)]
+    return lines
+
+
+def _casefolded_set(values:str|Iterable[str]|None) -> frozenset[str]|None:
+    if isinstance(values, str):
+        values = [values]
+    return frozenset(value.casefold() for value in values) if values else None
+
+
+def _match_all(line:_Line) -> bool:
+    return True
+
+
+def line_matcher(styles:str|Iterable[str]|None=None, actors:str|Iterable[str]|None=None, layers:int|Iterable[int]|None=None, comments:bool|None=None) -> Callable[[_Line], bool]:
+    """
+    Compiles line criteria once into a function that checks a single line.
+    Names are casefolded into frozensets, so every check is a set lookup. All given criteria have to match.
+
+    Usable on its own with `remove_lines`, e.g. `remove_lines(line_matcher(actors="note", comments=True))`.
+
     Args:
-        line (_Line): The line object containing text and style attributes to modify.
-        style (str): The style name or substring to match against the line's style.
-        tag (str): The tag to prepend to the line's text when a match occurs.
-        exact (bool): Whether the style match must be exact (True) or partial (False).
-        default_style (str, optional): The style to assign after tagging. Defaults to "Default".
-    
-    Returns:
-        None: The function modifies the `line` object in place.
+        styles (str | Iterable[str] | None): Style name(s). Caseinsensitive. Set to None to ignore.
+        actors (str | Iterable[str] | None): Actor name(s). Caseinsensitive. Set to None to ignore.
+        layers (int | Iterable[int] | None): Layer(s). Set to None to ignore.
+        comments (bool | None): True to only match comments, False to only match dialogue lines. Set to None to ignore.
+    """
+    styles = _casefolded_set(styles)
+    actors = _casefolded_set(actors)
+    if isinstance(layers, int):
+        layers = [layers]
+    layers = frozenset(layers) if layers else None
+    if styles is None and actors is None and layers is None and comments is None:
+        return _match_all
+
+    def _matches(line:_Line) -> bool:
+        if styles is not None and line.style.casefold() not in styles:
+            return False
+        if actors is not None and line.name.casefold() not in actors:
+            return False
+        if layers is not None and line.layer not in layers:
+            return False
+        if comments is not None and (line.TYPE == "Comment") != comments:
+            return False
+        return True
+    return _matches
+
+
+@traced_factory
+def remove_lines(remove:Callable[[_Line], bool]) -> Callable[[LINES], LINES]:
     """
-    if tag[0] != '\\':
-        tag = '\\' + tag
-    if (exact and style.casefold() == line.style.casefold()) or (not exact and style.casefold() in line.style.casefold()):
-        line.text = f"{{{tag}}}{line.text}"
-        line.style = default_style
+    Removes every line for which `remove` returns True.
+
+    Returns a function usable with .manipulate_lines().
+
+    Args:
+        remove (Callable[[_Line], bool]): Function that decides whether a line gets removed.
+    """
+    def _remove_lines(lines:LINES) -> LINES:
+        return _filter_lines(lines, remove)
+    _remove_lines.removes = remove
+    return _remove_lines
+
+
+# (style, tag, exact) in order of priority, the first match wins
+# exact matches compare the whole style name, the others check if the style name contains it, both caseinsensitive
+BD_DX_POSITION_STYLES: list[tuple[str, str|None, bool]] = [
+    ("Bottom Left", r"\an1", False),
+    ("BD DX", None, True),  # Default
+    ("Bottom Right", r"\an3", False),
+    ("Center Left", r"\an4", False),
+    ("BD Center", r"\an5", True),  # has to be exact, or compare last
+    ("Center Right", r"\an6", False),
+    ("Top Left", r"\an7", False),
+    ("Top DX", r"\an8", False),
+    ("Top Right", r"\an9", False),
+]
+
+
+@traced_factory
+def position_styles_to_tags(position_styles:list[tuple[str, str|None, bool]]|dict[str, str|None]=BD_DX_POSITION_STYLES, default_style:str="Default", signs_style:str="Signs", sign_actor:str|None="On-screen") -> Callable[[LINES], LINES]:
+    r"""
+    Changes position styles to the default style and prepends the matching \an tag.
+    Lines of the sign actor that use the default style are changed to the signs style and get an \an2 tag if they don't have an \an tag yet.
+
+    The mapping is compiled once: exact names go into a dict, substring matches into a single regex, and the result is cached per style name.
+
+    Returns a function usable with .manipulate_lines().
+
+    Args:
+        position_styles (list[tuple[str, str | None, bool]] | dict[str, str | None]): (style, tag, exact) tuples in order of priority, see `BD_DX_POSITION_STYLES`.
+            A dict maps style substrings to tags. A tag of None only changes the style.
+        default_style (str): The style matched lines are set to.
+        signs_style (str): The style used for the sign actor lines.
+        sign_actor (str | None): Actor name (substring, caseinsensitive) of signs. Set to None to skip.
+    """
+    if isinstance(position_styles, dict):
+        position_styles = [(style, tag, False) for style, tag in position_styles.items()]
+    prefixes = []
+    exact_matches = dict[str, int]()
+    substring_patterns = []
+    for i, (style, tag, exact) in enumerate(position_styles):
+        if tag and tag[0] != "\\":
+            tag = "\\" + tag
+        prefixes.append(f"{{{tag}}}" if tag else "")
+        if exact:
+            exact_matches.setdefault(style.casefold(), i)
+        else:
+            # lookaheads at the start make the alternation try the entries in order instead of finding the leftmost match
+            substring_patterns.append(f"(?=.*?(?P<s{i}>{re.escape(style.casefold())}))")
+    substring_match = re.compile("|".join(substring_patterns), re.DOTALL).match if substring_patterns else lambda style: None
+    sign_styles = {default_style.casefold(), "default"} | {style.casefold() for style, tag, exact in position_styles if exact and not tag}
+    sign_actor = sign_actor.casefold() if sign_actor else None
+    has_an_tag = re.compile(r"\\an", re.IGNORECASE).search
+    resolved_styles = dict[str, int|None]()
+    sign_names = dict[str, bool]()
+
+    def _resolve(style:str) -> int|None:
+        casefolded = style.casefold()
+        candidates = []
+        if (i := exact_matches.get(casefolded)) is not None:
+            candidates.append(i)
+        if (match := substring_match(casefolded)) is not None:
+            candidates.append(int(match.lastgroup[1:]))
+        return min(candidates) if candidates else None
 
+    @per_line
+    def _position_styles_to_tags(line:_Line) -> None:
+        style = line.style
+        if (i := resolved_styles.get(style, -1)) == -1:
+            i = resolved_styles[style] = _resolve(style)
+        if i is not None:
+            if prefixes[i]:
+                line.text = prefixes[i] + line.text
+            line.style = style = default_style
+        if sign_actor:
+            name = line.name
+            if (is_sign := sign_names.get(name)) is None:
+                is_sign = sign_names[name] = sign_actor in name.casefold()
+            if is_sign and style.casefold() in sign_styles:
+                if not has_an_tag(line.text):
+                    line.text = r"{\an2}" + line.text
+                line.style = signs_style
+    return _position_styles_to_tags
+
+
+_unfuck_bd_dx = position_styles_to_tags()
 
+
+@traced_manipulator(fuse_as=_unfuck_bd_dx)
 def unfuck_bd_dx(lines:LINES) -> LINES:
     """
-    Changes the styles of BD DX, BD Top DX, etc. to Default and Signs and adds the needed tags.
+    Changes the styles of BD DX, BD Top DX, etc. to Default and Signs and adds the needed tags, see `BD_DX_POSITION_STYLES`.
     
     Make sure the styles "Default" and "Signs" exist.
     
     Subs that use this style can be already fucked up (sometimes CR converts them to use Default style without adding an tags, sometimes script_res is 360p, sometimes 1080p and pos values don't have to match the resolution).
+    Use `position_styles_to_tags()` for other broadcasters' position styles.
     """
-    default_style = "Default"
-    signs_style = "Signs"
-    an1_style = "Bottom Left"
-    an2_style = "BD DX"  # Default
-    an3_style = "Bottom Right"
-    an4_style = "Center Left"
-    an5_style = "BD Center"  # has to be exact, or compare last
-    an6_style = "Center Right"
-    an7_style = "Top Left"
-    an8_style = "Top DX"
-    an9_style = "Top Right"
-    sign_actor = "On-screen"
-    for line in lines:
-        _replace_style_with_tag(line, style=an1_style, tag=r"\an1", exact=False)
-        replace_style(an2_style, default_style)([line])
-        _replace_style_with_tag(line, style=an3_style, tag=r"\an3", exact=False)
-        _replace_style_with_tag(line, style=an4_style, tag=r"\an4", exact=False)
-        _replace_style_with_tag(line, style=an5_style, tag=r"\an5", exact=True)
-        _replace_style_with_tag(line, style=an6_style, tag=r"\an6", exact=False)
-        _replace_style_with_tag(line, style=an7_style, tag=r"\an7", exact=False)
-        _replace_style_with_tag(line, style=an8_style, tag=r"\an8", exact=False)
-        _replace_style_with_tag(line, style=an9_style, tag=r"\an9", exact=False)
-        if sign_actor.casefold() in line.name.casefold():
-            if (line.style.casefold() in [style.casefold() for style in ["Default", default_style, an2_style]]):
-                if r"\an" not in line.text.casefold():
-                    tags = r"\an2"
-                    line.text = f"{{{tags}}}{line.text}"
-                line.style = signs_style
-    return lines
+    return _unfuck_bd_dx(lines)
+
+
+# Careful with stuff that could delete dialogue
+CREDIT_KEYWORDS: dict[str, list[str]] = {
+    "de": [
+        'Übersetzung:',
+        'Spotting:',
+        'Revision:',
+        'Typesetting:',
+        'Qualitätskontrolle:',
+        'Projektleitung:',
+    ],
+    "en": [
+        "Subtitle Timing",
+        "Editing & Typesetting",  # some English subtitle credits will be missed if they are in seperate lines
+    ],
+    "groups": [
+        "ToonsHub",
+        "KawaSubs",
+    ],
+}
+
+
+def _trie_pattern(words:Iterable[str]) -> str:
+    """
+    Builds a regex that matches any of the words, with common prefixes merged.
+    The regex engine only has to check the next character against one branch per distinct prefix, so adding words barely changes the scan cost.
+    """
+    trie: dict = {}
+    for word in words:
+        if not word:
+            continue
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def _build(node:dict) -> str:
+        optional = "" in node
+        branches = [re.escape(char) + _build(child) for char, child in node.items() if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if optional:
+            # a word ends here, longer words are still preferred but not required
+            pattern = f"(?:{pattern})?"
+        return pattern
+
+    return _build(trie)
+
+
+@traced_factory
+def credit_filter(keyword_sets:Iterable[str]|None=("de", "en", "groups"), keywords:Iterable[str]=(), patterns:Iterable[str|re.Pattern]=(), ignore_case:bool=False) -> Callable[[LINES], LINES]:
+    """
+    Removes lines that contain any of the given keywords or match any of the patterns.
 
+    All keywords and patterns are compiled once into a single regex, so every line is scanned once no matter how many keywords there are.
 
+    Returns a function usable with .manipulate_lines().
+
+    Args:
+        keyword_sets (Iterable[str] | None): Names of the keyword sets in `CREDIT_KEYWORDS` to use. Add your own sets to the dict or use `keywords`.
+        keywords (Iterable[str]): Additional keywords, e.g. group names. Matched as plain substrings, empty or whitespace-only keywords are ignored.
+        patterns (Iterable[str | re.Pattern]): Additional regexes. Inline flags are not supported, use `ignore_case` instead.
+        ignore_case (bool): Match keywords and patterns case-insensitively.
+    """
+    if isinstance(keyword_sets, str):
+        keyword_sets = [keyword_sets]
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    if isinstance(patterns, (str, re.Pattern)):
+        patterns = [patterns]
+    words = set(keywords)
+    for name in keyword_sets or []:
+        if name not in CREDIT_KEYWORDS:
+            raise ValueError(f"Unknown keyword set '{name}'. Available sets: {', '.join(CREDIT_KEYWORDS)}")
+        words.update(CREDIT_KEYWORDS[name])
+    # an empty keyword would match every line
+    words = {word for word in words if word.strip()}
+    if ignore_case:
+        # re.IGNORECASE uses simple case folding, casefold() would turn ß into ss
+        words = {word.lower() for word in words}
+    alternatives = [f"(?:{pattern.pattern if isinstance(pattern, re.Pattern) else pattern})" for pattern in patterns]
+    if words:
+        alternatives.insert(0, _trie_pattern(sorted(words)))
+    if not alternatives:
+        return lambda lines: lines
+    matcher = re.compile("|".join(alternatives), re.IGNORECASE if ignore_case else 0).search
+
+    def _is_credit(line:_Line) -> bool:
+        return matcher(line.text) is not None
+
+    def _credit_filter(lines:LINES) -> LINES:
+        return _filter_lines(lines, _is_credit)
+    _credit_filter.removes = _is_credit
+    return _credit_filter
+
+
+_remove_default_credits = credit_filter()
+
+
+@traced_manipulator(fuse_as=_remove_default_credits)
 def remove_credits(lines:LINES) -> LINES:
-    # Careful with stuff that could delete dialogue
-    credits = [
-            'Übersetzung:',
-            'Spotting:',
-            'Revision:',
-            'Typesetting:',
-            'Qualitätskontrolle:',
-            'Projektleitung:',
-            "ToonsHub",
-            "KawaSubs",
-            "Subtitle Timing",
-            "Editing & Typesetting",  # some English subtitle credits will be missed if they are in seperate lines
-        ]
-    removed_lines = []
-    for line in lines:
-        if any(credit in line.text for credit in credits):
-            removed_lines.append(line)
-    # removing lines inside the above loop skips the next iteration
-    for line in removed_lines:
-        lines.remove(line)
-    return lines
+    """
+    Removes translator credits etc. lines using all keyword sets in `CREDIT_KEYWORDS`.
+    Use `credit_filter()` for other keywords or patterns.
+    """
+    return _remove_default_credits(lines)
 
 
+WEIRD_UNICODE_DELETE = "\u200e\u200b\u05B9"
+WEIRD_UNICODE_REPLACE = {"\u2011": "-", "\uFF01": "!"}
+# Extra character sets for unicode_normalizer
+BIDI_MARKS = "\u200e\u200f\u202a\u202b\u202c\u202d\u202e\u2066\u2067\u2068\u2069"
+ZERO_WIDTH = "\u200b\u200c\u200d\u2060\ufeff"  # careful, \u200d is also used by emoji sequences
+FULLWIDTH_PUNCTUATION = {chr(0xFF01 + i): chr(0x21 + i) for i in range(0x5E) if not chr(0x21 + i).isalnum()}
+
+
+@traced_factory
+def unicode_normalizer(delete:Iterable[str]=WEIRD_UNICODE_DELETE, replace:dict[str, str]|None=WEIRD_UNICODE_REPLACE, normalization:Literal["NFC", "NFKC"]|None=None) -> Callable[[LINES], LINES]:
+    """
+    Deletes and replaces characters in every line.
+
+    The delete and replace maps are compiled into a single `str.translate` table, so each line is copied at most once no matter how many characters are configured.
+    Lines that are pure ASCII are skipped if none of the characters are ASCII, other lines are only translated if they contain any of the characters.
+
+    Returns a function usable with .manipulate_lines().
+
+    Args:
+        delete (Iterable[str]): Characters to delete. Strings are split into single characters, e.g. `WEIRD_UNICODE_DELETE + BIDI_MARKS`.
+        replace (dict[str, str] | None): Characters to replace with a string, e.g. `WEIRD_UNICODE_REPLACE | FULLWIDTH_PUNCTUATION`.
+        normalization (Literal["NFC", "NFKC"] | None): Unicode normalization applied after the replacements. NFKC also turns fullwidth characters into ASCII ones.
+    """
+    table = {ord(char): None for chars in delete for char in chars}
+    table.update({ord(char): replacement for char, replacement in (replace or {}).items()})
+    # normalizing doesn't change ASCII text either
+    skip_ascii = not any(char < 128 for char in table)
+    # translate() is slow on non-ASCII text, only run it on lines that contain any of the characters
+    contains = re.compile(f"[{''.join(re.escape(chr(char)) for char in table)}]").search if table else lambda text: False
+
+    @per_line
+    def _unicode_normalizer(line:_Line) -> None:
+        text = line.text
+        if skip_ascii and text.isascii():
+            return
+        new_text = text.translate(table) if contains(text) else text
+        if normalization:
+            new_text = unicodedata.normalize(normalization, new_text)
+        if new_text != text:
+            line.text = new_text
+    return _unicode_normalizer
+
+
+_strip_weird_unicode = unicode_normalizer()
+
+
+@traced_manipulator(fuse_as=_strip_weird_unicode)
 def strip_weird_unicode(lines:LINES) -> LINES:
-    unicode_list = [u"\u200e", u"\u200b", u"\u05B9"]
-    replace_list = [(u"\u2011", '-'),
-                    (u"\uFF01", "!")]
-    for line in lines:
-        for unicode in unicode_list:
-            line.text = line.text.replace(unicode, "")
-        for unicode, replacement in replace_list:
-            line.text = line.text.replace(unicode, replacement)
-    return lines
+    """
+    Deletes `WEIRD_UNICODE_DELETE` and replaces `WEIRD_UNICODE_REPLACE` characters.
+    Use `unicode_normalizer()` to extend the character sets.
+    """
+    return _strip_weird_unicode(lines)
+
+
+_FONT_TAG = re.compile(r"\\(fn|r)([^\\}]*)")
+
+
+def _font_substituter(candidates:re.Pattern, resolve:Callable[[str, str], str|None]) -> Callable[[str], str]:
+    r"""
+    Builds a function that sets the font of single characters in one walk over the text.
+
+    Override blocks are copied as they are while keeping track of the current \fn (\r and an empty \fn reset it to the style font).
+    In the text between them `candidates` finds runs of characters that might need another font and `resolve(char, current_font)` returns that font or None.
+    Adjacent characters that get the same font share one override block, after it the font is set back to the current one.
+    The current font is an empty string if the style font is used.
+    """
+    def _substitute_run(run:str, current_font:str) -> str:
+        out = []
+        group_font = None
+        group_start = 0
+        for i, char in enumerate(run):
+            font = resolve(char, current_font)
+            if font == current_font:
+                font = None
+            if font != group_font:
+                out.append(run[group_start:i] if group_font is None else f"{{\\fn{group_font}}}{run[group_start:i]}{{\\fn{current_font}}}")
+                group_font = font
+                group_start = i
+        out.append(run[group_start:] if group_font is None else f"{{\\fn{group_font}}}{run[group_start:]}{{\\fn{current_font}}}")
+        return "".join(out)
+
+    def _substitute(text:str) -> str:
+        out = []
+        current_font = ""
+        pos = 0
+        length = len(text)
+        while pos < length:
+            if text[pos] == "{" and (end := text.find("}", pos)) != -1:
+                block = text[pos:end + 1]
+                for tag, value in _FONT_TAG.findall(block):
+                    current_font = value if tag == "fn" else ""
+                out.append(block)
+                pos = end + 1
+                continue
+            end = text.find("{", pos + 1)
+            end = length if end == -1 else end
+            last = pos
+            for match in candidates.finditer(text, pos, end):
+                out.append(text[last:match.start()])
+                out.append(_substitute_run(match.group(), current_font))
+                last = match.end()
+            out.append(text[last:end])
+            pos = end
+        return "".join(out)
+    return _substitute
 
 
+@traced_factory
+def replace_fonts_for_glyphs(glyph_fonts:dict[str, str], styles:str|list[str]|None=None) -> Callable[[LINES], LINES]:
+    r"""
+    Replaces the font of glyphs, each glyph with its own font, in a single pass over every line.
+    After the glyph(s) the font is set back to the current \fn tag or style default if it's not present.
+    Adjacent glyphs that use the same font share one override block. Text inside override blocks is not touched.
+
+    Returns a function usable with .manipulate_lines().
+
+    Args:
+        glyph_fonts (dict[str, str]): Single characters mapped to the font that includes them.
+        styles (str | list[str] | None): Only replace fonts of specific styles. Caseinsensitive. Set to None to ignore styles.
+    """
+    if any(len(glyph) != 1 for glyph in glyph_fonts):
+        raise ValueError("Glyphs have to be single characters.")
+    matches = line_matcher(styles=styles)
+    glyph_fonts = dict(glyph_fonts)
+    if not glyph_fonts:
+        return per_line(lambda line: None)
+    candidates = re.compile(f"[{''.join(re.escape(glyph) for glyph in glyph_fonts)}]+")
+    substitute = _font_substituter(candidates, lambda char, current_font: glyph_fonts.get(char))
+
+    @per_line
+    def _replace_fonts_for_glyphs(line:_Line) -> None:
+        if candidates.search(line.text) and matches(line):
+            line.text = substitute(line.text)
+    return _replace_fonts_for_glyphs
+
+
+@traced_factory
 def replace_font_for_glyphs(glyphs:list[str], replacement_font:str, styles:list[str]|None=None) -> Callable[[LINES], LINES]:
     r"""
     Replaces the font of glyphs.
@@ -119,83 +443,127 @@ def replace_font_for_glyphs(glyphs:list[str], replacement_font:str, styles:list[
         replacement_font (str): The font that includes the glyph(s).
         style (list[str] | None): Only replace fonts of a specific style. Set to None to ignore styles.
     """
-    if type(glyphs) == str:
-        glyphs = list(glyphs)
-    fn_pattern = re.compile(r'\\fn([^\\}]+)(?=[\\}])')  # this is supposed to find \fnFont that ends with '\' or '}'. Include this? ')'
-    def _replace_font_for_glyph(lines:LINES) -> LINES:
-        for line in lines:
-            for glyph in glyphs:
-                if glyph in line.text:
-                    if not styles or (line.style.casefold() in [style.casefold() for style in styles]):
-                        replaced_text = ""
-                        end_text = ""
-                        prev_find = 0
-                        for glyph_match in re.finditer(glyph, line.text):
-                            pos = glyph_match.start()
-                            before = line.text[:pos]
-                            fn_matches = fn_pattern.findall(before)
-                            last_fn = fn_matches[-1] if fn_matches else ""
-                            replaced_text += line.text[prev_find:pos] + fr"{{\fn{replacement_font}}}{glyph}{{\fn{last_fn}}}"
-                            end_text = line.text[pos+1:]
-                            prev_find = pos + 1
-                        line.text = replaced_text + end_text
-                        # line.text = line.text.replace(glyph, fr"{{\fn{replacement_font}}}{glyph}{{\fn}}")
-        return lines
-    return _replace_font_for_glyph
+    return replace_fonts_for_glyphs({glyph: replacement_font for glyph in glyphs}, styles)
+
 
+MISSING_GLYPH_FONTS = {
+    '♪': "Arial",
+    '・': "Arial Unicode MS",
+    '）': "Yu Gothic",  # replace with normal brackets?
+    '（': "Yu Gothic",  # 5mb font, who cares
+    'α': "Arial",
+    '☆': "Segoe UI Symbol",
+    '❤': "Segoe UI Symbol",
+    '「': "Yu Gothic UI Semibold",
+    '」': "Yu Gothic UI Semibold",
+}  # add glyphs here
 
+
+_fix_missing_glyphs = replace_fonts_for_glyphs(MISSING_GLYPH_FONTS)
+
+
+@traced_manipulator(fuse_as=_fix_missing_glyphs)
 def fix_missing_glyphs(lines:LINES) -> LINES:
     r"""
-    Replaces the used font for glyphs that most fonts don't include.
+    Replaces the used font for glyphs that most fonts don't include, see `MISSING_GLYPH_FONTS`.
     
     This replaces stuff regardless of style and whether it is commented or not.
     """
-    glyphs = [('♪', "Arial"),
-              ('・', "Arial Unicode MS"),
-              ('）', "Yu Gothic"),  # replace with normal brackets?
-              ('（', "Yu Gothic"), # 5mb font, who cares
-              ('α', "Arial"),
-              ('☆', "Segoe UI Symbol"),
-              ('❤', "Segoe UI Symbol"),
-              ('「', "Yu Gothic UI Semibold"),
-              ('」', "Yu Gothic UI Semibold")
-              ]  # add glyphs here
-    for glyph, font in glyphs:
-        lines = replace_font_for_glyphs(glyphs=glyph, replacement_font=font)(lines)
-    return lines
+    return _fix_missing_glyphs(lines)
+
+
+FALLBACK_FONTS = ["Arial", "Arial Unicode MS", "Segoe UI Symbol", "Yu Gothic"]
+_NON_ASCII = re.compile(r"[^\x00-\x7f]+")
+
+
+@traced_factory
+def fix_uncovered_glyphs(coverage:FontCoverage, style_fonts:dict[str, str], fallback_fonts:Iterable[str]=FALLBACK_FONTS, styles:str|list[str]|None=None) -> Callable[[LINES], LINES]:
+    r"""
+    Replaces the font of glyphs that the font they are rendered with doesn't cover, using the first font of `fallback_fonts` that covers them.
+    Unlike `fix_missing_glyphs` only characters that are actually missing are touched, the font is taken from the \fn tags or the line's style.
+
+    ASCII characters are assumed to be covered by every font. Characters used with fonts that aren't in `coverage` are left alone,
+    as are characters no fallback font covers. Every font and character pair is resolved once per returned function.
+
+    Returns a function usable with .manipulate_lines().
+
+    Example usage:
+        ```py
+        coverage = FontCoverage("fonts", cache_dir=".cache/fonts")
+        subfile.manipulate_lines(fix_uncovered_glyphs(coverage, StyleIndex(subfile).fonts(), ["Arial", "Yu Gothic"]))
+        ```
+
+    Args:
+        coverage (FontCoverage): Index of the fonts used by the styles, the \fn tags and the fallback fonts.
+        style_fonts (dict[str, str]): Style names mapped to their font, see `StyleIndex.fonts()`. Lines with an unknown style use the font of Default like libass does.
+        fallback_fonts (Iterable[str]): Fonts to try in order. Fonts that aren't in `coverage` are skipped.
+        styles (str | list[str] | None): Only replace fonts of specific styles. Caseinsensitive. Set to None to ignore styles.
+    """
+    fallback_fonts = [font for font in fallback_fonts if font in coverage]
+    style_fonts = {style.casefold(): font for style, font in style_fonts.items()}
+    default_font = style_fonts.get("default", "")
+    matches = line_matcher(styles=styles)
+    # (font, char) -> replacement font or None, shared by the substituters of every style font
+    resolved = dict[tuple[str, str], str|None]()
+    substituters = dict[str, Callable[[str], str]]()
+
+    def _substituter(style_font:str) -> Callable[[str], str]:
+        def _resolve(char:str, current_font:str) -> str|None:
+            font = current_font or style_font
+            key = (font, char)
+            if key not in resolved:
+                uncovered = coverage.covers(font, char) is False and char.isprintable() and not char.isspace()
+                resolved[key] = coverage.fallback(char, fallback_fonts) if uncovered else None
+            return resolved[key]
+        return _font_substituter(_NON_ASCII, _resolve)
 
+    @per_line
+    def _fix_uncovered_glyphs(line:_Line) -> None:
+        text = line.text
+        if text.isascii() or not matches(line):
+            return
+        style_font = style_fonts.get(line.style.casefold(), default_font)
+        if (substitute := substituters.get(style_font)) is None:
+            substitute = substituters[style_font] = _substituter(style_font)
+        new_text = substitute(text)
+        if new_text != text:
+            line.text = new_text
+    return _fix_uncovered_glyphs
 
+
+@traced_factory
 def replace_substr(old:str, new:str, styles:list[str]=None) -> Callable[[LINES], LINES]:
     """
     Replaces every occurence of a string with another.
     
     Returns a function usable with .manipulate_lines().
     """
-    if type(styles) == str:
-        styles = [styles]
+    matches = line_matcher(styles=styles)
     
-    def _replace_substr(lines:LINES) -> LINES:
-        for line in lines:
-            if not styles or (line.style.casefold() in styles):
-                line.text = line.text.replace(old, new)
-        return lines
+    @per_line
+    def _replace_substr(line:_Line) -> None:
+        if matches(line):
+            line.text = line.text.replace(old, new)
     return _replace_substr
 
 
+@traced_factory
 def replace_style(old:str, new:str) -> Callable[[LINES], LINES]:
     """
     Replaces a every occurence of a style with another.
     
     Returns a function usable with .manipulate_lines().
     """
-    def _replace_style(lines:LINES) -> LINES:
-        for line in lines:
-            if line.style.casefold() == old.casefold():
-                line.style = new
-        return lines
+    matches = line_matcher(styles=old)
+
+    @per_line
+    def _replace_style(line:_Line) -> None:
+        if matches(line):
+            line.style = new
     return _replace_style
 
 
+@traced_factory
 def change_style_for_actor(actor:str|list[str], old_style:str|list[str]|None, new_style:str) -> Callable[[LINES], LINES]:
     """
     Changes the style for a specific actor name e.g. sign.
@@ -207,72 +575,70 @@ def change_style_for_actor(actor:str|list[str], old_style:str|list[str]|None, ne
         old_style (str | list[str] | None): The old style(s) to match. Set to None to ignore.
         new_style (str): The style name used as the replacement.
     """
-    if isinstance(old_style, str):
-        old_style = [old_style]
-    if isinstance(actor, str):
-        actor = [actor]
-    def _change_style_for_actor(lines:LINES) -> LINES:
-        for line in lines:
-            style_match = line.style.casefold() in [style.casefold() for style in old_style]
-            actor_match = line.name.casefold() in [actr.casefold() for actr in actor]
-            if actor_match and (not old_style or style_match):
-                line.style = new_style
-        return lines
+    matches = line_matcher(styles=old_style, actors=actor)
+
+    @per_line
+    def _change_style_for_actor(line:_Line) -> None:
+        if matches(line):
+            line.style = new_style
     return _change_style_for_actor
 
 
+@traced_factory
 def trim_subs(lower_bound:int|None=None, upper_bound:int|None=None, framerate:Fraction|float = Fraction(24000, 1001)) -> Callable[[LINES], LINES]:
     """
     Trim subtitles. Removes lines that are outside the bounds.
     Trims lines that extend past it.
+    Use `cut_frames()` to keep several frame ranges at once.
     
     Returns a function usable with .manipulate_lines().
     """
     #TODO look at timesource and timescale
-    lower_bound = timedelta(seconds=float(lower_bound / framerate)) if lower_bound else None
-    upper_bound = timedelta(seconds=float(upper_bound / framerate)) if upper_bound else None
+    lower_bound = frame_to_time(lower_bound, framerate) if lower_bound else None
+    upper_bound = frame_to_time(upper_bound, framerate) if upper_bound else None
+    padding = timedelta(milliseconds=float(1000/framerate/2))
+    trimmed_start = lower_bound - padding if lower_bound is not None else None
+    trimmed_end = upper_bound + padding if upper_bound is not None else None
+
+    def _outside(line:_Line) -> bool:
+        return (upper_bound is not None and line.start > upper_bound) or (lower_bound is not None and line.end < lower_bound)
 
     def _trim_subs(lines:LINES) -> LINES:
-        removed_lines = []
+        # same single pass as _filter_lines, the kept lines are trimmed in it
+        kept = []
         for line in lines:
-            if upper_bound and ((line.start - upper_bound) > timedelta()):
-                removed_lines.append(line)
-            if lower_bound and ((lower_bound - line.end) > timedelta()):
-                removed_lines.append(line)
-        for line in removed_lines:
-            lines.remove(line)
-        # combining both loops would be better
-        for line in lines:
-            if upper_bound and ((line.end - upper_bound) > timedelta()):
-                line.end = upper_bound + timedelta(milliseconds=float(1000/framerate/2))
-            if lower_bound and ((lower_bound - line.start) > timedelta()):
-                line.start = lower_bound - timedelta(milliseconds=float(1000/framerate/2))
+            if _outside(line):
+                continue
+            if upper_bound is not None and line.end > upper_bound:
+                line.end = trimmed_end
+            if lower_bound is not None and line.start < lower_bound:
+                line.start = trimmed_start
+            kept.append(line)
+        lines[:] = kept
         return lines
     return _trim_subs
 
 
+@traced_factory
 def swap_italic_tags(styles:str|list[str]|None=None, actors:str|list[str]|None=None) -> Callable[[LINES], LINES]:
     r"""
-    Swaps \i1 and \i0.  
+    Swaps \i1 and \i0. Lines without override tags are skipped, the tags are parsed through the shared `line_tags` cache.
     Returns a function usable with .manipulate_lines().
     
     Args:
         styles (str | list[str] | None): Only work on lines that match the style name(s). Caseinsensitive. Set to None to ignore.
         actors (str | list[str] | None): Only work on lines that match the actor name(s). Caseinsensitive. Set to None to ignore.
     """
-    styles = [styles] if isinstance(styles, str) else styles
-    actors = [actors] if isinstance(actors, str) else actors
+    matches = line_matcher(styles=styles, actors=actors)
         
-    def _swap_italic_tags(lines:LINES) -> LINES:
-        for line in lines:
-            if styles and line.style.casefold() not in styles:
-                continue
-            if actors and line.name.casefold() not in actors:
-                continue
-            items = parse_line(line.text)
-            for item in items:
-                if isinstance(item, AssValidTagItalic):
-                    item.enabled = not item.enabled
-            line.text = ass_item_to_text(items)
-        return lines
+    @per_line
+    def _swap_italic_tags(line:_Line) -> None:
+        if not matches(line) or (items := line_tags(line)) is None:
+            return
+        italics = [item for item in items if isinstance(item, AssValidTagItalic)]
+        if not italics:
+            return
+        for item in italics:
+            item.enabled = not item.enabled
+        set_line_tags(line, items)
     return _swap_italic_tags
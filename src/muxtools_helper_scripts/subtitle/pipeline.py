@@ -0,0 +1,125 @@
+import time
+from collections.abc import Callable
+from functools import update_wrapper
+from typing import Any
+from muxtools import debug
+from muxtools.subtitle.sub import LINES
+from muxtools.subtitle.basesub import _Line
+from ..utils.trace import current_tracer
+
+
+__all__ = ["per_line", "LinePipeline"]
+
+
+def per_line(func:Callable[[_Line], None]) -> Callable[[LINES], LINES]:
+    """
+    Turns a function that edits a single line into one usable with .manipulate_lines().
+    The line function stays available as `.per_line`, `LinePipeline` uses it to run several of them in one loop.
+    """
+    def _for_each_line(lines:LINES) -> LINES:
+        for line in lines:
+            func(line)
+        return lines
+    update_wrapper(_for_each_line, func)
+    _for_each_line.per_line = func
+    return _for_each_line
+
+
+def _name(func:Callable) -> str:
+    return getattr(func, "__name__", None) or type(func).__name__
+
+
+def _fuse(steps:list[tuple[bool, Callable[[_Line], Any]]]) -> Callable[[LINES], LINES]:
+    """
+    Runs line edits and filters in a single loop. Steps are (is_filter, func) in order.
+    A removed line skips the steps after its filter, which gives the same result as running every step on its own.
+    """
+    if not any(is_filter for is_filter, func in steps):
+        funcs = [func for is_filter, func in steps]
+        def _fused(lines:LINES) -> LINES:
+            for line in lines:
+                for func in funcs:
+                    func(line)
+            return lines
+        return _fused
+
+    def _fused_with_filters(lines:LINES) -> LINES:
+        kept = []
+        for line in lines:
+            for is_filter, func in steps:
+                if func(line) and is_filter:
+                    break
+            else:
+                kept.append(line)
+        lines[:] = kept
+        return lines
+    return _fused_with_filters
+
+
+class LinePipeline:
+    """
+    Runs several line manipulators as one function usable with .manipulate_lines().
+
+    Manipulators made with `per_line` (most factories in `line_manipulators`) and line filters (`remove_lines`, `credit_filter`, `remove_credits`)
+    are fused, so consecutive ones walk the lines only once. Every other function (e.g. `trim_subs`) needs the whole list and runs as its own stage.
+    The result is the same as calling .manipulate_lines() for every manipulator in order.
+
+    Example usage:
+        ```py
+        pipeline = LinePipeline(strip_weird_unicode, remove_credits, replace_substr("...", "…"), fix_missing_glyphs)
+        subfile.manipulate_lines(pipeline)
+        pipeline.report()
+        ```
+    """
+    def __init__(self, *manipulators:Callable[[LINES], LINES|None]):
+        self.manipulators = list(manipulators)
+        self.timings = list[tuple[str, float]]()
+        """(stage name, seconds) of the last run."""
+
+    def add(self, *manipulators:Callable[[LINES], LINES|None]) -> "LinePipeline":
+        self.manipulators.extend(manipulators)
+        return self
+
+    def stages(self) -> list[tuple[str, Callable[[LINES], LINES|None]]]:
+        """
+        Returns the (name, function) stages the manipulators get grouped into.
+        """
+        stages = list[tuple[str, Callable[[LINES], LINES|None]]]()
+        steps = list[tuple[bool, Callable[[_Line], Any]]]()
+        names = list[str]()
+
+        def _close() -> None:
+            if steps:
+                stages.append((" + ".join(names), _fuse(steps.copy())))
+                steps.clear()
+                names.clear()
+
+        for manipulator in self.manipulators:
+            if (line_func := getattr(manipulator, "per_line", None)) is not None:
+                steps.append((False, line_func))
+            elif (remove := getattr(manipulator, "removes", None)) is not None:
+                steps.append((True, remove))
+            else:
+                _close()
+                stages.append((_name(manipulator), manipulator))
+                continue
+            names.append(_name(manipulator))
+        _close()
+        return stages
+
+    def __call__(self, lines:LINES) -> LINES:
+        self.timings = []
+        for name, stage in self.stages():
+            start = time.perf_counter()
+            result = stage(lines)
+            end = time.perf_counter()
+            self.timings.append((name, end - start))
+            if (tracer := current_tracer()) is not None:
+                tracer.add(name, "pipeline", start, end, lines=len(lines))
+            if result is not None:
+                lines = result
+        return lines
+
+    def report(self) -> None:
+        for name, seconds in self.timings:
+            debug(f"{seconds * 1000:8.2f} ms  {name}", self)
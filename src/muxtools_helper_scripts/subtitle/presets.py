@@ -1,189 +1,173 @@
-from muxtools.subtitle import get_complimenting_styles, default_style_args
+from collections.abc import Callable
 from ass.line import Style
 from ass.data import Color
 
 
-__all__ = ["GANDHI_PRESET", "GANDHI_UW_PRESET", "SIGNS_PRESET", "NOTO_PRESET", "JPN_PRESET", "KOR_PRESET", "SC_PRESET", "TC_PRESET", "THAI_PRESET", "ARAB_PRESET"]
+__all__ = ["GANDHI_PRESET", "GANDHI_UW_PRESET", "SIGNS_PRESET", "NOTO_PRESET", "JPN_PRESET", "KOR_PRESET", "SC_PRESET", "TC_PRESET", "THAI_PRESET", "ARAB_PRESET", "register_preset", "get_preset", "preset_names"]
+
+
+# Presets are built on first access and memoized, building them needs muxtools which is slow to import.
+_PRESET_FACTORIES = dict[str, Callable[[], list[Style]]]()
+_presets = dict[str, list[Style]]()
+
+
+def register_preset(name:str, factory:Callable[[], list[Style]]) -> None:
+    """
+    Adds a preset that is built by calling `factory` the first time it's used.
+    Registering a name again replaces the preset.
+    """
+    _PRESET_FACTORIES[name] = factory
+    _presets.pop(name, None)
+
+
+def get_preset(name:str) -> list[Style]:
+    """
+    Returns a preset by name, e.g. "GANDHI_PRESET". The list is built once and shared by every caller.
+    """
+    if (styles := _presets.get(name)) is None:
+        if name not in _PRESET_FACTORIES:
+            raise KeyError(f"Unknown preset '{name}'.")
+        styles = _presets[name] = _PRESET_FACTORIES[name]()
+    return styles
+
+
+def preset_names() -> list[str]:
+    return list(_PRESET_FACTORIES)
+
+
+def __getattr__(name:str) -> list[Style]:
+    if name in _PRESET_FACTORIES:
+        return get_preset(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _preset(name:str) -> Callable[[Callable[[], list[Style]]], Callable[[], list[Style]]]:
+    def _register(factory:Callable[[], list[Style]]) -> Callable[[], list[Style]]:
+        register_preset(name, factory)
+        return factory
+    return _register
+
+
+def _with_complimenting_styles(default:Style) -> list[Style]:
+    from muxtools.subtitle import get_complimenting_styles
+    return [default, *get_complimenting_styles(default)]
+
+
+def _dialogue_default(fontname:str, fontsize:float=75.0, outline:float=3.6, shadow:float=1.5, margin_l:int=150, margin_r:int=150, margin_v:int=55) -> Style:
+    from muxtools.subtitle import default_style_args
+    return Style(
+        name="Default",
+        fontname=fontname,
+        fontsize=fontsize,
+        outline=outline,
+        shadow=shadow,
+        margin_l=margin_l,
+        margin_r=margin_r,
+        margin_v=margin_v,
+        **default_style_args,
+    )
 
 
 # slightly smaller left and right margins to prevent 3-liners and I don't mind it extending further
-gandhi_default = Style(
-    name="Default",
-    fontname="Gandhi Sans",
-    fontsize=75.0,
-    outline=3.6,
-    shadow=1.5,
-    margin_l=150,
-    margin_r=150,
-    margin_v=55,
-    **default_style_args,
-)
-
-GANDHI_PRESET = [gandhi_default, *get_complimenting_styles(gandhi_default)]
+@_preset("GANDHI_PRESET")
+def _gandhi() -> list[Style]:
+    return _with_complimenting_styles(_dialogue_default("Gandhi Sans"))
+
 
 # smaller font size for ultrawide content on an ultrawide screen
-gandhi_uw_default = Style(
-    name="Default",
-    fontname="Gandhi Sans",
-    fontsize=57.0,  # still slightly larger than the normal gandhi preset on 16:9
-    outline=2.7,
-    shadow=1.125,
-    margin_l=300,
-    margin_r=300,
-    margin_v=40,
-    **default_style_args,
-)
-
-GANDHI_UW_PRESET = [gandhi_uw_default, *get_complimenting_styles(gandhi_uw_default)]
-
-signs_default = Style(
-    name="Signs",
-    fontname="Arial",
-    fontsize=60.0,
-    outline=4.0,
-    shadow=0.0,
-    margin_l=60,
-    margin_r=60,
-    margin_v=60,
-    bold=True,
-    italic=False,
-    underline=False,
-    strike_out=False,
-    scale_x=100.0,
-    scale_y=100.0,
-    spacing=0.0,
-    angle=0.0,
-    encoding=1,
-    alignment=8,
-    border_style=1,
-    primary_color=Color(r=0xFF, g=0xFF, b=0xFF, a=0x00),
-    secondary_color=Color(r=0xFF, g=0x00, b=0x00, a=0x00),
-    outline_color=Color(r=0x00, g=0x00, b=0x00, a=0x00),
-    back_color=Color(r=0x00, g=0x00, b=0x00, a=0xA0),
-)
-
-sign_default = Style(
-    name="Sign",
-    fontname="Arial",
-    fontsize=60.0,
-    outline=4.0,
-    shadow=0.0,
-    margin_l=60,
-    margin_r=60,
-    margin_v=60,
-    bold=True,
-    italic=False,
-    underline=False,
-    strike_out=False,
-    scale_x=100.0,
-    scale_y=100.0,
-    spacing=0.0,
-    angle=0.0,
-    encoding=1,
-    alignment=8,
-    border_style=1,
-    primary_color=Color(r=0xFF, g=0xFF, b=0xFF, a=0x00),
-    secondary_color=Color(r=0xFF, g=0x00, b=0x00, a=0x00),
-    outline_color=Color(r=0x00, g=0x00, b=0x00, a=0x00),
-    back_color=Color(r=0x00, g=0x00, b=0x00, a=0xA0),
-)
-
-SIGNS_PRESET = [signs_default, sign_default]
-
-noto_default = Style(
-    name="Default",
-    fontname="Noto Sans",
-    fontsize=75.0,
-    outline=3.6,
-    shadow=1.5,
-    margin_l=150,
-    margin_r=150,
-    margin_v=55,
-    **default_style_args,
-)
-
-NOTO_PRESET = [noto_default, *get_complimenting_styles(noto_default)]
-
-jpn_default = Style(
-    name="Default",
-    fontname="Noto Sans JP",
-    fontsize=75.0,
-    outline=3.6,
-    shadow=1.5,
-    margin_l=150,
-    margin_r=150,
-    margin_v=55,
-    **default_style_args,
-)
-
-JPN_PRESET = [jpn_default, *get_complimenting_styles(jpn_default)]
-
-kor_default = Style(
-    name="Default",
-    fontname="Noto Sans KR",
-    fontsize=75.0,
-    outline=3.6,
-    shadow=1.5,
-    margin_l=150,
-    margin_r=150,
-    margin_v=55,
-    **default_style_args,
-)
-
-KOR_PRESET = [kor_default, *get_complimenting_styles(kor_default)]
-
-sc_default = Style(
-    name="Default",
-    fontname="Noto Sans SC",
-    fontsize=75.0,
-    outline=3.6,
-    shadow=1.5,
-    margin_l=150,
-    margin_r=150,
-    margin_v=55,
-    **default_style_args,
-)
-
-SC_PRESET = [sc_default, *get_complimenting_styles(sc_default)]
-
-tc_default = Style(
-    name="Default",
-    fontname="Noto Sans TC",
-    fontsize=75.0,
-    outline=3.6,
-    shadow=1.5,
-    margin_l=150,
-    margin_r=150,
-    margin_v=55,
-    **default_style_args,
-)
-
-TC_PRESET = [tc_default, *get_complimenting_styles(tc_default)]
-
-thai_default = Style(
-    name="Default",
-    fontname="Noto Sans Thai",
-    fontsize=75.0,
-    outline=3.6,
-    shadow=1.5,
-    margin_l=150,
-    margin_r=150,
-    margin_v=55,
-    **default_style_args,
-)
-
-THAI_PRESET = [thai_default, *get_complimenting_styles(thai_default)]
-
-arab_default = Style(
-    name="Default",
-    fontname="Noto Sans Arabic",
-    fontsize=75.0,
-    outline=3.6,
-    shadow=1.5,
-    margin_l=150,
-    margin_r=150,
-    margin_v=55,
-    **default_style_args,
-)
-
-ARAB_PRESET = [arab_default, *get_complimenting_styles(arab_default)]
+@_preset("GANDHI_UW_PRESET")
+def _gandhi_uw() -> list[Style]:
+    # still slightly larger than the normal gandhi preset on 16:9
+    return _with_complimenting_styles(_dialogue_default("Gandhi Sans", fontsize=57.0, outline=2.7, shadow=1.125, margin_l=300, margin_r=300, margin_v=40))
+
+
+@_preset("SIGNS_PRESET")
+def _signs() -> list[Style]:
+    signs_default = Style(
+        name="Signs",
+        fontname="Arial",
+        fontsize=60.0,
+        outline=4.0,
+        shadow=0.0,
+        margin_l=60,
+        margin_r=60,
+        margin_v=60,
+        bold=True,
+        italic=False,
+        underline=False,
+        strike_out=False,
+        scale_x=100.0,
+        scale_y=100.0,
+        spacing=0.0,
+        angle=0.0,
+        encoding=1,
+        alignment=8,
+        border_style=1,
+        primary_color=Color(r=0xFF, g=0xFF, b=0xFF, a=0x00),
+        secondary_color=Color(r=0xFF, g=0x00, b=0x00, a=0x00),
+        outline_color=Color(r=0x00, g=0x00, b=0x00, a=0x00),
+        back_color=Color(r=0x00, g=0x00, b=0x00, a=0xA0),
+    )
+
+    sign_default = Style(
+        name="Sign",
+        fontname="Arial",
+        fontsize=60.0,
+        outline=4.0,
+        shadow=0.0,
+        margin_l=60,
+        margin_r=60,
+        margin_v=60,
+        bold=True,
+        italic=False,
+        underline=False,
+        strike_out=False,
+        scale_x=100.0,
+        scale_y=100.0,
+        spacing=0.0,
+        angle=0.0,
+        encoding=1,
+        alignment=8,
+        border_style=1,
+        primary_color=Color(r=0xFF, g=0xFF, b=0xFF, a=0x00),
+        secondary_color=Color(r=0xFF, g=0x00, b=0x00, a=0x00),
+        outline_color=Color(r=0x00, g=0x00, b=0x00, a=0x00),
+        back_color=Color(r=0x00, g=0x00, b=0x00, a=0xA0),
+    )
+
+    return [signs_default, sign_default]
+
+
+@_preset("NOTO_PRESET")
+def _noto() -> list[Style]:
+    return _with_complimenting_styles(_dialogue_default("Noto Sans"))
+
+
+@_preset("JPN_PRESET")
+def _jpn() -> list[Style]:
+    return _with_complimenting_styles(_dialogue_default("Noto Sans JP"))
+
+
+@_preset("KOR_PRESET")
+def _kor() -> list[Style]:
+    return _with_complimenting_styles(_dialogue_default("Noto Sans KR"))
+
+
+@_preset("SC_PRESET")
+def _sc() -> list[Style]:
+    return _with_complimenting_styles(_dialogue_default("Noto Sans SC"))
+
+
+@_preset("TC_PRESET")
+def _tc() -> list[Style]:
+    return _with_complimenting_styles(_dialogue_default("Noto Sans TC"))
+
+
+@_preset("THAI_PRESET")
+def _thai() -> list[Style]:
+    return _with_complimenting_styles(_dialogue_default("Noto Sans Thai"))
+
+
+@_preset("ARAB_PRESET")
+def _arab() -> list[Style]:
+    return _with_complimenting_styles(_dialogue_default("Noto Sans Arabic"))
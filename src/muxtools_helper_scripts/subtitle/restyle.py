@@ -1,15 +1,51 @@
+import inspect
+from collections.abc import Callable
+from contextlib import nullcontext
+from functools import wraps
 from muxtools import ParsedFile, SubFile, ASSHeader, Premux, PathLike, GlobSearch, TrackType, ensure_path_exists
-from .style import get_style
-from .presets import GANDHI_PRESET, SIGNS_PRESET
+from .document import single_parse
+from .style import StyleIndex
+from .presets import get_preset
 from .line_manipulators import unfuck_bd_dx, strip_weird_unicode, fix_missing_glyphs, change_style_for_actor
 from .line_manipulators import remove_credits as rmv_credits
+from ..utils.results import result_cache, file_digest
+from ..utils.trace import traced
 from ass import Style
 
 
 __all__ = ["restyle_cr", "restyle_bd_dx"]
 
 
-def restyle_cr(subfile:SubFile, remove_credits:bool=True, purge_macrons:bool=True, styles:Style|list[Style]=GANDHI_PRESET, replace_glyph_font:bool=False, italicize_narrator:bool=False) -> SubFile:
+def _cached_restyle(func:Callable[..., SubFile]) -> Callable[..., SubFile]:
+    """
+    Returns the cached output if the same file content was restyled with the same options before, see `result_cache`.
+    The cache is skipped inside a `single_parse` context, the file on disk doesn't have the current document there.
+    """
+    signature = inspect.signature(func)
+
+    @wraps(func)
+    def _restyle(subfile:SubFile, *args, **kwargs) -> SubFile:
+        if not result_cache.enabled or "_read_doc" in vars(subfile):
+            return func(subfile, *args, **kwargs)
+        bound = signature.bind(subfile, *args, **kwargs)
+        bound.apply_defaults()
+        # fused doesn't change the output
+        options = {name: value for name, value in bound.arguments.items() if name not in ("subfile", "fused")}
+        if options.get("styles") is None:
+            options["styles"] = get_preset("GANDHI_PRESET")
+        key = result_cache.key(func.__name__, file_digest(subfile.file), options)
+        if (cached := result_cache.get(key)) is not None:
+            subfile.file.write_bytes(cached[0])
+            return subfile
+        subfile = func(subfile, *args, **kwargs)
+        result_cache.put(key, subfile.file.read_bytes(), {"function": func.__name__, "source": str(subfile.file)})
+        return subfile
+    return _restyle
+
+
+@traced()
+@_cached_restyle
+def restyle_cr(subfile:SubFile, remove_credits:bool=True, purge_macrons:bool=True, styles:Style|list[Style]|None=None, replace_glyph_font:bool=False, italicize_narrator:bool=False, fused:bool=True) -> SubFile:
     r"""
     This function applies a standard set of ASS header values, converts top styles into tags, and reapplies one or more target styles.
     Optional post-processing steps allow removal of credit lines, macron stripping, and glyph font substitution for missing characters.
@@ -18,60 +54,67 @@ def restyle_cr(subfile:SubFile, remove_credits:bool=True, purge_macrons:bool=Tru
         subfile (SubFile): The subtitle file to be processed and restyled.
         remove_credits (bool, optional): Whether to remove translator credits etc. lines. Defaults to True.
         purge_macrons (bool, optional): Whether to remove macrons from dialogue text. Defaults to True.
-        styles (Style | list[Style], optional): Style or list of styles to apply to the subtitle file. Defaults to `GANDHI_PRESET`.
+        styles (Style | list[Style] | None, optional): Style or list of styles to apply to the subtitle file. None uses `GANDHI_PRESET`.
         replace_glyph_font (bool, optional): Whether to replace fonts to fix missing glyphs. Defaults to False.
         italicize_narrator (bool, optional): Whether to italize lines that use a narrator style. Defaults to False. If it doesn't match the original narrator style \i tags to emphasize words will be broken.
+        fused (bool, optional): Parse the file once, run every step in memory and write it once at the end. The output is the same as running every step on the file. Defaults to True.
 
     Returns:
         SubFile: The processed and restyled subtitle file.
     """
+
+    if styles is None:
+        styles = get_preset("GANDHI_PRESET")
+    with single_parse(subfile) if fused else nullcontext(subfile):
+        main2, default2, bc2, ot2 = StyleIndex(subfile).get_many(["main", "default", "bottomcenter", "on top"])
+        sign_actors = ["sign", "On-screen", "title"]
+        if main2:
+            main2.name = "signs2"
+            subfile.manipulate_lines(change_style_for_actor(sign_actors, old_style="main", new_style="signs2")).restyle(main2, adjust_styles=False)
+        if default2:
+            default2.name = "signs3"
+            subfile.manipulate_lines(change_style_for_actor(sign_actors, old_style="default", new_style="signs3")).restyle(default2, adjust_styles=False)
+        if bc2:
+            bc2.name = "signs4"
+            subfile.manipulate_lines(change_style_for_actor(sign_actors, old_style="bottomcenter", new_style="signs4")).restyle(bc2, adjust_styles=False)
+        if ot2:
+            ot2.name = "signs5"
+            subfile.manipulate_lines(change_style_for_actor(sign_actors, old_style="on top", new_style="signs5")).restyle(ot2, adjust_styles=False)
     
-    # inefficient
-    main2 = get_style(subfile, "main")
-    default2 = get_style(subfile, "default")
-    bc2 = get_style(subfile, "bottomcenter")
-    ot2 = get_style(subfile, "on top")
-    sign_actors = ["sign", "On-screen", "title"]
-    if main2:
-        main2.name = "signs2"
-        subfile.manipulate_lines(change_style_for_actor(sign_actors, old_style="main", new_style="signs2")).restyle(main2, adjust_styles=False)
-    if default2:
-        default2.name = "signs3"
-        subfile.manipulate_lines(change_style_for_actor(sign_actors, old_style="default", new_style="signs3")).restyle(default2, adjust_styles=False)
-    if bc2:
-        bc2.name = "signs4"
-        subfile.manipulate_lines(change_style_for_actor(sign_actors, old_style="bottomcenter", new_style="signs4")).restyle(bc2, adjust_styles=False)
-    if ot2:
-        ot2.name = "signs5"
-        subfile.manipulate_lines(change_style_for_actor(sign_actors, old_style="on top", new_style="signs5")).restyle(ot2, adjust_styles=False)
-    
-    subfile = subfile\
-        .set_headers((ASSHeader.LayoutResX, 640), (ASSHeader.LayoutResY, 360), (ASSHeader.ScaledBorderAndShadow, True), (ASSHeader.YCbCr_Matrix, "TV.709"))\
-        .manipulate_lines(strip_weird_unicode)
-    if italicize_narrator:
-        subfile = subfile.unfuck_cr(dialogue_styles=["main", "default", "bottomcenter"], alt_styles=["alt", "overlap"], italics_styles=["italics", "internal", "narrator", "narration"])
-    else:
-        subfile = subfile.unfuck_cr(dialogue_styles=["main", "default", "narrator", "narration", "bottomcenter"], alt_styles=["alt", "overlap"])
+        subfile = subfile\
+            .set_headers((ASSHeader.LayoutResX, 640), (ASSHeader.LayoutResY, 360), (ASSHeader.ScaledBorderAndShadow, True), (ASSHeader.YCbCr_Matrix, "TV.709"))\
+            .manipulate_lines(strip_weird_unicode)
+        if italicize_narrator:
+            subfile = subfile.unfuck_cr(dialogue_styles=["main", "default", "bottomcenter"], alt_styles=["alt", "overlap"], italics_styles=["italics", "internal", "narrator", "narration"])
+        else:
+            subfile = subfile.unfuck_cr(dialogue_styles=["main", "default", "narrator", "narration", "bottomcenter"], alt_styles=["alt", "overlap"])
 
-    subfile = subfile.restyle(styles)
-    if remove_credits:
-        subfile = subfile.manipulate_lines(rmv_credits)
-    if purge_macrons:
-        subfile = subfile.purge_macrons()
-    if replace_glyph_font:
-        subfile = subfile.manipulate_lines(fix_missing_glyphs)
+        subfile = subfile.restyle(styles)
+        if remove_credits:
+            subfile = subfile.manipulate_lines(rmv_credits)
+        if purge_macrons:
+            subfile = subfile.purge_macrons()
+        if replace_glyph_font:
+            subfile = subfile.manipulate_lines(fix_missing_glyphs)
     return subfile
 
 
-def restyle_bd_dx(subfile:SubFile, styles:Style|list[Style]=GANDHI_PRESET) -> SubFile:
+@traced()
+@_cached_restyle
+def restyle_bd_dx(subfile:SubFile, styles:Style|list[Style]|None=None, fused:bool=True) -> SubFile:
     r"""    
     Subs that use this style can be already fucked up (sometimes CR converts them to use Default style without adding \an tags, sometimes script_res is 360p, sometimes 1080p and \pos values don't have to match the resolution).
+
+    Set `fused` to False to write the file after every step instead of once at the end.
     """
-    subfile = subfile\
-        .set_headers([ASSHeader.LayoutResX, 640], [ASSHeader.LayoutResY, 360], [ASSHeader.ScaledBorderAndShadow, True], [ASSHeader.YCbCr_Matrix, "TV.709"])\
-        .manipulate_lines(unfuck_bd_dx)\
-        .unfuck_cr()\
-        .manipulate_lines(strip_weird_unicode)\
-        .restyle(SIGNS_PRESET)\
-        .restyle(styles)
+    if styles is None:
+        styles = get_preset("GANDHI_PRESET")
+    with single_parse(subfile) if fused else nullcontext(subfile):
+        subfile = subfile\
+            .set_headers([ASSHeader.LayoutResX, 640], [ASSHeader.LayoutResY, 360], [ASSHeader.ScaledBorderAndShadow, True], [ASSHeader.YCbCr_Matrix, "TV.709"])\
+            .manipulate_lines(unfuck_bd_dx)\
+            .unfuck_cr()\
+            .manipulate_lines(strip_weird_unicode)\
+            .restyle(get_preset("SIGNS_PRESET"))\
+            .restyle(styles)
     return subfile
\ No newline at end of file
@@ -0,0 +1,118 @@
+from collections.abc import Callable, Iterator
+from itertools import islice
+from pathlib import Path
+from typing import TextIO
+from muxtools import PathLike, SubFile, ensure_path_exists
+from muxtools.subtitle.sub import LINES
+from muxtools.subtitle.basesub import _Line
+from ass.section import EventsSection, LineSection
+
+
+__all__ = ["iter_events", "stream_lines"]
+
+
+def _is_section_header(line:str) -> bool:
+    return line.startswith("[") and line.endswith("]")
+
+
+def _events(reader:TextIO, field_order:list[str]) -> Iterator[_Line]:
+    """
+    Parses event lines from the current position until the next section header, the same way `ass.Document` does.
+    `field_order` is updated in place when a Format line is read. The section header that ends the events is yielded as a string.
+    """
+    for raw in reader:
+        line = raw.strip()
+        if not line or line.startswith(";"):
+            continue
+        if _is_section_header(line):
+            yield raw
+            return
+        if ":" not in line:
+            continue
+        type_name, _, value = line.partition(":")
+        if type_name.lower() == LineSection.FORMAT_TYPE.lower():
+            field_order[:] = [field.strip() for field in value.split(",")]
+            continue
+        if (parser := EventsSection.line_parsers.get(type_name.lower())) is None:
+            raise ValueError(f"unexpected {type_name} line in Events")
+        yield parser.parse(type_name, value.lstrip(), field_order)
+
+
+def _skip_to_events(reader:TextIO, writer:TextIO|None=None) -> bool:
+    for raw in reader:
+        if writer:
+            writer.write(raw)
+        if raw.strip().casefold() == "[events]":
+            return True
+    return False
+
+
+def iter_events(file:PathLike, encoding:str="utf_8_sig") -> Iterator[_Line]:
+    """
+    Reads the events of an ASS file one at a time without loading the document.
+
+    Args:
+        file (PathLike): The ASS file.
+        encoding (str): Encoding of the file.
+    """
+    file = ensure_path_exists(file, "iter_events")
+    field_order = list(EventsSection.field_order)
+    with open(file, "r", encoding=encoding) as reader:
+        if not _skip_to_events(reader):
+            return
+        for event in _events(reader, field_order):
+            if isinstance(event, str):
+                return
+            yield event
+
+
+def stream_lines(subfile:SubFile, *manipulators:Callable[[LINES], LINES|None], chunk_size:int=5000) -> SubFile:
+    """
+    Runs line manipulators over the events in chunks while reading and writing the file, instead of loading the whole document.
+
+    Memory use is bounded by one chunk of events. Everything outside the [Events] section is copied as it is.
+    The events are written like `manipulate_lines` would write them, comments (;) inside the section are dropped.
+    Every manipulator in `line_manipulators` works on chunks. A custom one must not depend on seeing all lines at once.
+
+    Example usage:
+        ```py
+        stream_lines(subfile, strip_weird_unicode, remove_credits, fix_missing_glyphs)
+        ```
+
+    Args:
+        subfile (SubFile): The subtitle file, edited in place.
+        manipulators (Callable[[LINES], LINES | None]): Functions usable with .manipulate_lines(), applied to each chunk in order.
+        chunk_size (int): Number of events per chunk.
+
+    Returns:
+        SubFile: The same subtitle file.
+    """
+    file = Path(subfile.file)
+    tmp = file.with_name(f"{file.name}.tmp")
+    field_order = list(EventsSection.field_order)
+    try:
+        with open(file, "r", encoding=subfile.encoding) as reader, open(tmp, "w", encoding=subfile.encoding) as writer:
+            if not _skip_to_events(reader, writer):
+                raise ValueError(f"'{file.name}' has no [Events] section.")
+            events = _events(reader, field_order)
+            # the Format line is read before the first event, so the first chunk has to be pulled before writing it
+            chunk = list(islice(events, chunk_size))
+            writer.write(f"{LineSection.FORMAT_TYPE}: {', '.join(field_order)}\n")
+            next_section = None
+            while chunk:
+                if isinstance(chunk[-1], str):
+                    next_section = chunk.pop()
+                lines = chunk
+                for manipulator in manipulators:
+                    if (result := manipulator(lines)) is not None:
+                        lines = result
+                writer.writelines(f"{line.dump_with_type(field_order)}\n" for line in lines)
+                chunk = list(islice(events, chunk_size)) if next_section is None else []
+            if next_section is not None:
+                writer.write("\n")
+                writer.write(next_section)
+                writer.writelines(reader)
+        tmp.replace(file)
+    finally:
+        tmp.unlink(True)
+    return subfile
@@ -1,16 +1,153 @@
+import re
+from collections.abc import Iterable
+from copy import deepcopy
 from muxtools import SubFile
 from ass import Style
 
 
-__all__ = ["get_style"]
+__all__ = ["StyleIndex", "get_style"]
+
+
+class StyleIndex:
+    """
+    The styles of a SubFile, parsed once and indexed by casefolded name.
+
+    Lookups return copies, so renaming a returned style doesn't touch the document.
+    `add`, `rename` and `replace` edit the parsed document and `write` saves every change at once.
+    Used as a context manager it writes on exit unless an exception was raised.
+
+    Example usage:
+        ```py
+        with StyleIndex(subfile) as styles:
+            main, top = styles.get_many(["main", "top"])
+            styles.rename("Top", "Default Top")
+        ```
+
+    Args:
+        subfile (SubFile): The subtitle file to read the styles from.
+    """
+    def __init__(self, subfile:SubFile):
+        self.subfile = subfile
+        self.doc = subfile._read_doc()
+        self.modified = False
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._styles = dict[str, Style]()
+        for style in self.doc.styles:
+            # the first style wins like in a linear search
+            self._styles.setdefault(style.name.casefold(), style)
+
+    def __contains__(self, name:str) -> bool:
+        return name.casefold() in self._styles
+
+    def __len__(self) -> int:
+        return len(self._styles)
+
+    def names(self) -> list[str]:
+        return [style.name for style in self._styles.values()]
+
+    def fonts(self) -> dict[str, str]:
+        """
+        Returns the font of every style by style name.
+        """
+        return {style.name: style.fontname for style in self._styles.values()}
+
+    def get(self, name:str) -> Style|None:
+        """
+        Returns a copy of the style with that name (caseinsensitive) or None.
+        """
+        style = self._styles.get(name.casefold())
+        return deepcopy(style) if style is not None else None
+
+    def get_many(self, names:Iterable[str]) -> list[Style|None]:
+        """
+        Returns copies of the styles in the order of `names`, None for missing ones.
+        """
+        return [self.get(name) for name in names]
+
+    def find(self, substring:str) -> list[Style]:
+        """
+        Returns copies of every style whose name contains `substring` (caseinsensitive).
+        """
+        substring = substring.casefold()
+        return [deepcopy(style) for name, style in self._styles.items() if substring in name]
+
+    def match(self, pattern:str|re.Pattern, flags:int=re.IGNORECASE) -> list[Style]:
+        """
+        Returns copies of every style whose name matches the regex anywhere. Caseinsensitive unless other `flags` are passed.
+        """
+        search = (pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)).search
+        return [deepcopy(style) for style in self._styles.values() if search(style.name)]
+
+    def add(self, style:Style, replace:bool=False) -> "StyleIndex":
+        """
+        Adds a copy of the style. A style with the same name is kept unless `replace` is set.
+        """
+        if style.name.casefold() in self._styles:
+            if replace:
+                self.replace(style)
+            return self
+        style = deepcopy(style)
+        self.doc.styles.append(style)
+        self._styles[style.name.casefold()] = style
+        self.modified = True
+        return self
+
+    def replace(self, style:Style) -> "StyleIndex":
+        """
+        Replaces the style with the same name (caseinsensitive) by a copy of `style`.
+
+        Raises:
+            KeyError: If there is no style with that name.
+        """
+        old = self._styles[style.name.casefold()]
+        style = deepcopy(style)
+        styles = self.doc.styles
+        styles[next(i for i, existing in enumerate(styles) if existing is old)] = style
+        self._styles[style.name.casefold()] = style
+        self.modified = True
+        return self
+
+    def rename(self, old_name:str, new_name:str, update_lines:bool=True) -> "StyleIndex":
+        """
+        Renames a style and, if `update_lines` is set, every line that uses it.
+
+        Raises:
+            KeyError: If there is no style with that name.
+        """
+        style = self._styles[old_name.casefold()]
+        old_name = style.name.casefold()
+        style.name = new_name
+        if update_lines:
+            for line in self.doc.events:
+                if line.style.casefold() == old_name:
+                    line.style = new_name
+        self._reindex()
+        self.modified = True
+        return self
+
+    def write(self) -> SubFile:
+        """
+        Writes the document if anything changed.
+        """
+        if self.modified:
+            self.subfile._update_doc(self.doc)
+            self.modified = False
+        return self.subfile
+
+    def __enter__(self) -> "StyleIndex":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.write()
 
 
 def get_style(subfile:SubFile, style_name:str) -> Style|None:
-    doc = subfile._read_doc()
-    styles = doc.styles  # what exactly is doc.styles? idk
-    for style in styles:
-        if style.name.casefold() == style_name.casefold():
-            return style
-    else:
-        # Throw an error instead?
-        return None
+    """
+    Returns a copy of a style (caseinsensitive) or None.
+    Every call parses the document, use `StyleIndex` to look up several styles.
+    """
+    # returns a copy so renaming it doesn't touch a document that is kept in memory by single_parse
+    return StyleIndex(subfile).get(style_name)
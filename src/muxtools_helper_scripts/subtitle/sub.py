@@ -1,14 +1,42 @@
-from muxtools import ParsedFile, PathLike, SubFile, TrackType, ensure_path_exists
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from muxtools import ParsedFile, PathLike, SubFile, TrackInfo, TrackType, ensure_path_exists, get_executable, get_workdir, run_commandline, error
+from ..utils.matroska import MatroskaError, MatroskaFile, MatroskaTrack, read_matroska_tracks
+from ..utils.probe import cached_probe
+from ..utils.results import result_cache, file_stamp
+from ..utils.trace import traced
 
 
-__all__ = ["get_sub_track", "all_subs_from_mkv"]
+__all__ = ["get_sub_track", "all_subs_from_mkv", "LazySubTrack", "lazy_subs_from_mkv", "load_sub_tracks"]
 
 
+def _probe_tracks(file:Path, caller:str, preserve_delay:bool) -> MatroskaFile|ParsedFile:
+    """
+    Reads the track headers directly if possible and only probes the file if the container delay is needed or it isn't a Matroska file.
+    """
+    if not preserve_delay:
+        try:
+            return read_matroska_tracks(file, caller)
+        except MatroskaError:
+            pass
+    return cached_probe(file, caller)
+
+
+def _language_ietf(track:MatroskaTrack|TrackInfo) -> str|None:
+    if isinstance(track, MatroskaTrack):
+        return track.language_ietf
+    return track.raw_mkvmerge.properties.language_ietf if track.raw_mkvmerge else None
+
+
+@traced()
 def get_sub_track(file:PathLike, name:str|None=None, lang:str|None=None, is_forced:bool=False, is_default:bool|None=None, preserve_delay:bool=False, quiet:bool=True) -> SubFile:
     """
     Return a SubFile object of the first matched track.
 
     Useful if you do not know the track ID or if it changes between episodes.
+    Track headers are read directly from the file, mkvmerge/ffprobe are only used for `preserve_delay` or non-Matroska files.
+    Those probes are cached, see `probe_cache`. The extracted track is cached in `result_cache` if it's enabled.
 
     Args:
         file (PathLike): Input MKV file.
@@ -23,7 +51,15 @@ def get_sub_track(file:PathLike, name:str|None=None, lang:str|None=None, is_forc
     """
     caller = "get_sub_track"
     file = ensure_path_exists(file, caller)
-    parsed = ParsedFile.from_file(file, caller)
+    if result_cache.enabled:
+        # hashing the whole container would take longer than extracting
+        key = result_cache.key(caller, file_stamp(file), dict(name=name, lang=lang, is_forced=is_forced, is_default=is_default, preserve_delay=preserve_delay))
+        if (cached := result_cache.get(key)) is not None:
+            data, meta = cached
+            out = Path(get_workdir(), meta["file"])
+            out.write_bytes(data)
+            return SubFile(out, container_delay=meta["container_delay"], source=file)
+    parsed = _probe_tracks(file, caller, preserve_delay)
     if is_default != None:
         condition = lambda track: (track.is_forced == is_forced) and (track.is_default == is_default)
     else:
@@ -34,7 +70,11 @@ def get_sub_track(file:PathLike, name:str|None=None, lang:str|None=None, is_forc
             print(f"Matched subtitle track {parsed_track.relative_index} with title: {parsed_track.title}")
         else:
             print("No matches found")
-    return SubFile.from_mkv(file, track=parsed_track.relative_index, preserve_delay=preserve_delay, quiet=quiet)
+    # from_mkv would probe the file again
+    subfile = _extract_subs(SubFile, file, [parsed_track], preserve_delay=preserve_delay, quiet=quiet, caller=caller)[0]
+    if result_cache.enabled:
+        result_cache.put(key, subfile.file.read_bytes(), {"function": caller, "source": str(file), "file": subfile.file.name, "container_delay": subfile.container_delay})
+    return subfile
 
 
 class SubFileExtended(SubFile):
@@ -45,11 +85,44 @@ class SubFileExtended(SubFile):
     is_forced: bool
 
 
-def all_subs_from_mkv(file:PathLike, preserve_delay: bool = False) -> list[SubFileExtended]:
+def _extract_subs(cls:type[SubFile], file:Path, parsed_tracks:list[TrackInfo|MatroskaTrack], preserve_delay:bool=False, quiet:bool=True, caller:str="_extract_subs") -> list[SubFile]:
+    """
+    Extracts all given subtitle tracks with a single mkvextract call, so the container is only read once.
+    Does the same as `SubFile.from_mkv` for each track.
+    """
+    for track in parsed_tracks:
+        if track.codec_name not in ["ass", "subrip"]:
+            raise error(f"Track {track.index} is not an ASS or SRT subtitle.", caller)
+    if not parsed_tracks:
+        return []
+
+    outs = [Path(get_workdir(), f"{file.stem}_{track.index}.{'ass' if track.codec_name == 'ass' else 'srt'}") for track in parsed_tracks]
+    mkvextract = get_executable("mkvextract")
+    args = [mkvextract, str(file), "tracks", *[f"{track.index}:{str(out)}" for track, out in zip(parsed_tracks, outs)]]
+    if run_commandline(args, quiet):
+        raise error("Failed to extract subtitles!", caller)
+
+    sub_files = []
+    for track, out in zip(parsed_tracks, outs):
+        delay = 0 if not preserve_delay else track.container_delay
+        if track.codec_name == "subrip":
+            subfile = cls.from_srt(out)
+            subfile.container_delay = delay
+            subfile.source = file
+            out.unlink(True)
+        else:
+            subfile = cls(file=out, container_delay=delay, source=file)
+        sub_files.append(subfile)
+    return sub_files
+
+
+@traced()
+def all_subs_from_mkv(file:PathLike, preserve_delay: bool = False, quiet:bool=True) -> list[SubFileExtended]:
     """
     WIP
     
     Extract all subtitles with language and title attributes.
+    All tracks are extracted in a single pass over the file. Use `lazy_subs_from_mkv` to only extract the tracks that are used.
     
     language is 3 letter code (ISO 639-2) and always present.
     
@@ -71,16 +144,113 @@ def all_subs_from_mkv(file:PathLike, preserve_delay: bool = False) -> list[SubFi
     #? standardize_tag() for easier comparisons?
     caller = "all_subs_srom_mkv"
     file = ensure_path_exists(file, caller)
-    parsed = ParsedFile.from_file(file, caller)
+    parsed = _probe_tracks(file, caller, preserve_delay)
     parsed_tracks = parsed.find_tracks(type=TrackType.SUB)
-    sub_files = []
-    for track in parsed_tracks:
-        subfile = SubFileExtended.from_mkv(file, track=track.relative_index, preserve_delay=preserve_delay)
-        subfile.title = track.title
-        # turn into Language object?
-        subfile.language = track.language
-        subfile.language_ietf = track.raw_mkvmerge.properties.language_ietf
-        subfile.is_default = track.is_default
-        subfile.is_forced = track.is_forced
-        sub_files.append(subfile)
+    sub_files = _extract_subs(SubFileExtended, file, parsed_tracks, preserve_delay=preserve_delay, quiet=quiet, caller=caller)
+    for track, subfile in zip(parsed_tracks, sub_files):
+        _set_track_attributes(subfile, track)
     return sub_files
+
+
+def _set_track_attributes(subfile:SubFileExtended, track:TrackInfo|MatroskaTrack) -> None:
+    subfile.title = track.title
+    # turn into Language object?
+    subfile.language = track.language
+    subfile.language_ietf = _language_ietf(track)
+    subfile.is_default = track.is_default
+    subfile.is_forced = track.is_forced
+
+
+@dataclass(eq=False)
+class LazySubTrack:
+    """
+    A subtitle track of a container that is only extracted when `load()` is called or `subfile` is accessed.
+    Not to be confused with `muxtools.SubTrack`, which is a track for muxing.
+
+    Attributes:
+        file (Path): The container.
+        index (int): Track ID in the container.
+        title (str | None): Track name.
+        language (str | None): 3 letter code (ISO 639-2).
+        language_ietf (str | None): BCP 47 tag, might not be present for older files.
+        is_default (bool): Default flag.
+        is_forced (bool): Forced flag.
+        codec_name (str): "ass" or "subrip" for tracks that can be loaded.
+    """
+    file: Path
+    index: int
+    title: str|None
+    language: str|None
+    language_ietf: str|None
+    is_default: bool
+    is_forced: bool
+    codec_name: str
+    preserve_delay: bool = False
+    quiet: bool = True
+    _track: TrackInfo|MatroskaTrack|None = field(default=None, repr=False)
+    _subfile: SubFileExtended|None = field(default=None, repr=False)
+
+    @classmethod
+    def from_track(cls, file:Path, track:TrackInfo|MatroskaTrack, preserve_delay:bool=False, quiet:bool=True) -> "LazySubTrack":
+        return cls(file, track.index, track.title, track.language, _language_ietf(track), track.is_default, track.is_forced, track.codec_name, preserve_delay, quiet, track)
+
+    @property
+    def loaded(self) -> bool:
+        return self._subfile is not None
+
+    def load(self) -> SubFileExtended:
+        """
+        Extracts the track on the first call and returns the same SubFile on every call after it.
+        Use `load_sub_tracks` to extract several tracks of a container with one mkvextract call.
+        """
+        if self._subfile is None:
+            load_sub_tracks([self])
+        return self._subfile
+
+    @property
+    def subfile(self) -> SubFileExtended:
+        """
+        The content of the track, extracted on first access. Same as `load()`.
+        """
+        return self.load()
+
+
+@traced()
+def lazy_subs_from_mkv(file:PathLike, preserve_delay:bool=False, quiet:bool=True) -> list[LazySubTrack]:
+    """
+    Lazy variant of `all_subs_from_mkv`, returns a descriptor for every subtitle track that only reads the track headers.
+    A track is extracted once its `load()` is called or its `subfile` is accessed, so filtering by language only costs time and disk space for the tracks that are used.
+
+    Example usage:
+        ```py
+        english = [track for track in lazy_subs_from_mkv(file) if track.language == "eng"]
+        sub = english[0].subfile
+        ```
+    """
+    caller = "lazy_subs_from_mkv"
+    file = ensure_path_exists(file, caller)
+    parsed = _probe_tracks(file, caller, preserve_delay)
+    return [LazySubTrack.from_track(file, track, preserve_delay, quiet) for track in parsed.find_tracks(type=TrackType.SUB)]
+
+
+@traced()
+def load_sub_tracks(tracks:Iterable[LazySubTrack]) -> list[SubFileExtended]:
+    """
+    Loads several tracks at once, tracks of the same container that aren't loaded yet are extracted with a single mkvextract call.
+
+    Returns:
+        list[SubFileExtended]: The SubFiles in the order of `tracks`.
+    """
+    tracks = list(tracks)
+    pending = dict[tuple[Path, bool, bool], list[LazySubTrack]]()
+    seen = set[int]()
+    for track in tracks:
+        if track._subfile is None and id(track) not in seen:
+            seen.add(id(track))
+            pending.setdefault((track.file, track.preserve_delay, track.quiet), []).append(track)
+    for (file, preserve_delay, quiet), group in pending.items():
+        parsed_tracks = [track._track for track in group]
+        for track, subfile in zip(group, _extract_subs(SubFileExtended, file, parsed_tracks, preserve_delay=preserve_delay, quiet=quiet, caller="load_sub_tracks")):
+            _set_track_attributes(subfile, track._track)
+            track._subfile = subfile
+    return [track._subfile for track in tracks]
@@ -0,0 +1,41 @@
+from weakref import WeakKeyDictionary
+from muxtools.subtitle.basesub import _Line
+from ass_tag_analyzer import parse_line, ass_item_to_text, AssItem
+
+
+__all__ = ["line_tags", "set_line_tags"]
+
+
+# line -> (text the items were parsed from, items)
+_parsed = WeakKeyDictionary[_Line, tuple[str, list[AssItem]]]()
+
+
+def line_tags(line:_Line) -> list[AssItem]|None:
+    """
+    Returns the parsed override tags and text of a line, see `ass_tag_analyzer.parse_line`.
+
+    Lines are parsed at most once, the result is reused until `line.text` changes.
+    Lines without an override block aren't parsed at all and return None.
+    Edit the returned items and pass them to `set_line_tags`, which writes the text once and keeps the cache valid.
+
+    Args:
+        line (_Line): The line to parse.
+    """
+    text = line.text
+    if "{" not in text:
+        return None
+    cached = _parsed.get(line)
+    if cached is not None and cached[0] == text:
+        return cached[1]
+    items = parse_line(text)
+    _parsed[line] = (text, items)
+    return items
+
+
+def set_line_tags(line:_Line, items:list[AssItem]) -> None:
+    """
+    Serializes edited items from `line_tags` back into `line.text`.
+    """
+    text = ass_item_to_text(items)
+    line.text = text
+    _parsed[line] = (text, items)
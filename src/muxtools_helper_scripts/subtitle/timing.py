@@ -0,0 +1,211 @@
+from bisect import bisect_left
+from datetime import timedelta
+from fractions import Fraction
+from collections.abc import Callable, Iterable
+from muxtools.subtitle.sub import LINES
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+__all__ = ["LineTimes", "frame_to_time", "keep_ranges", "shift_lines", "cut_frames"]
+
+
+# stand-ins for open bounds, far outside anything a subtitle uses
+_MIN = -(1 << 62)
+_MAX = 1 << 62
+
+
+def _us(time:timedelta) -> int:
+    return (time.days * 86400 + time.seconds) * 1_000_000 + time.microseconds
+
+
+def frame_to_time(frame:int, framerate:Fraction|float=Fraction(24000, 1001)) -> timedelta:
+    """
+    Returns the start time of a frame the same way `trim_subs` computes its bounds.
+    """
+    return timedelta(seconds=float(frame / framerate))
+
+
+def _sorted_ranges(ranges:Iterable[tuple[timedelta|None, timedelta|None]]) -> list[tuple[int, int]]:
+    """
+    Converts keep-ranges to microseconds, sorts them and merges overlapping ones. None is an open bound.
+    """
+    converted = sorted((_MIN if start is None else _us(start), _MAX if end is None else _us(end)) for start, end in ranges)
+    merged = list[tuple[int, int]]()
+    for start, end in converted:
+        if start > end:
+            raise ValueError("A keep-range can't end before it starts.")
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class LineTimes:
+    """
+    Start and end times of lines as integer microsecond arrays (the resolution of `timedelta`, so nothing gets rounded).
+
+    Uses NumPy if it's installed and plain lists otherwise.
+    Every operation works on the arrays. `apply` writes the changed times back and removes dropped lines in one pass.
+
+    Example usage:
+        ```py
+        def _cut(lines):
+            times = LineTimes(lines)
+            times.keep([(timedelta(), op_start), (op_end, ed_start)], close_gaps=True)
+            return times.apply()
+        subfile.manipulate_lines(_cut)
+        ```
+    """
+    def __init__(self, lines:LINES):
+        self.lines = lines
+        # inlined _us, this runs for every line
+        starts = [(time.days * 86400 + time.seconds) * 1_000_000 + time.microseconds for time in (line.start for line in lines)]
+        ends = [(time.days * 86400 + time.seconds) * 1_000_000 + time.microseconds for time in (line.end for line in lines)]
+        if np is not None:
+            self.starts = np.array(starts, dtype=np.int64)
+            self.ends = np.array(ends, dtype=np.int64)
+            self.kept = np.ones(len(starts), dtype=bool)
+        else:
+            self.starts = list(starts)
+            self.ends = list(ends)
+            self.kept = [True] * len(starts)
+        self._original = (starts, ends)
+
+    def shift(self, offset:timedelta) -> "LineTimes":
+        """
+        Moves every line by `offset`. Times that would become negative are set to 0.
+        """
+        offset = _us(offset)
+        if np is not None:
+            self.starts = np.maximum(self.starts + offset, 0)
+            self.ends = np.maximum(self.ends + offset, 0)
+        else:
+            self.starts = [max(start + offset, 0) for start in self.starts]
+            self.ends = [max(end + offset, 0) for end in self.ends]
+        return self
+
+    def keep(self, ranges:Iterable[tuple[timedelta|None, timedelta|None]], padding:timedelta=timedelta(), close_gaps:bool=False) -> "LineTimes":
+        """
+        Drops every line outside the keep-ranges and trims lines that extend past the range they start in.
+
+        A line is kept if it overlaps a range, bounds are inclusive. It's trimmed to the first range it overlaps.
+        The ranges are sorted and merged once, each line finds its range with a binary search.
+
+        Args:
+            ranges (Iterable[tuple[timedelta | None, timedelta | None]]): (start, end) pairs, None for an open bound.
+            padding (timedelta): Trimmed times are set this far outside the range, e.g. half a frame so the line still covers the boundary frame.
+            close_gaps (bool): Moves the ranges back to back starting at 0, e.g. to follow a video that got the OP and ED cut out.
+                An open start counts as 0.
+        """
+        ranges = _sorted_ranges(ranges)
+        if not ranges:
+            self.kept = self.kept & False if np is not None else [False] * len(self.kept)
+            return self
+        padding = _us(padding)
+        range_starts = [start for start, end in ranges]
+        range_ends = [end for start, end in ranges]
+        offsets = list[int]()
+        position = 0
+        for start, end in ranges:
+            if close_gaps:
+                # an open start begins at 0, an open end can only be the last range so nothing comes after it
+                start = max(start, 0)
+                offsets.append(position - start)
+                position += end - start
+            else:
+                offsets.append(0)
+
+        if np is not None:
+            range_starts, range_ends, offsets = np.array(range_starts, dtype=np.int64), np.array(range_ends, dtype=np.int64), np.array(offsets, dtype=np.int64)
+            index = np.searchsorted(range_ends, self.starts, side="left")
+            valid = index < len(ranges)
+            index = np.minimum(index, len(ranges) - 1)
+            lower, upper = range_starts[index], range_ends[index]
+            self.kept &= valid & (lower <= self.ends)
+            starts = np.where(self.starts < lower, lower - padding, self.starts) + offsets[index]
+            ends = np.where(self.ends > upper, upper + padding, self.ends) + offsets[index]
+            self.starts, self.ends = np.maximum(starts, 0), np.maximum(ends, 0)
+            return self
+
+        for i, (start, end) in enumerate(zip(self.starts, self.ends)):
+            r = bisect_left(range_ends, start)
+            if r == len(ranges) or range_starts[r] > end:
+                self.kept[i] = False
+                continue
+            lower, upper, offset = range_starts[r], range_ends[r], offsets[r]
+            self.starts[i] = max((lower - padding if start < lower else start) + offset, 0)
+            self.ends[i] = max((upper + padding if end > upper else end) + offset, 0)
+        return self
+
+    def apply(self) -> LINES:
+        """
+        Writes changed times back to the lines and removes the dropped ones. The list is edited in place.
+        """
+        lines = self.lines
+        original_starts, original_ends = self._original
+        if np is not None:
+            kept = np.flatnonzero(self.kept)
+            # only touches the kept lines, converting the arrays at once is a lot faster than creating every timedelta on its own
+            for times, original, name in ((self.starts, original_starts, "start"), (self.ends, original_ends, "end")):
+                changed = kept[times[kept] != np.asarray(original, dtype=np.int64)[kept]]
+                for i, time in zip(changed.tolist(), times[changed].astype("timedelta64[us]").tolist()):
+                    setattr(lines[i], name, time)
+            remaining = [lines[i] for i in kept.tolist()]
+        else:
+            remaining = []
+            for line, start, end, original_start, original_end, keep in zip(lines, self.starts, self.ends, original_starts, original_ends, self.kept):
+                if not keep:
+                    continue
+                if start != original_start:
+                    line.start = timedelta(microseconds=start)
+                if end != original_end:
+                    line.end = timedelta(microseconds=end)
+                remaining.append(line)
+        self.lines[:] = remaining
+        return self.lines
+
+
+def keep_ranges(ranges:Iterable[tuple[timedelta|None, timedelta|None]], padding:timedelta=timedelta(), close_gaps:bool=False) -> Callable[[LINES], LINES]:
+    """
+    Keeps the lines inside the keep-ranges, see `LineTimes.keep`.
+
+    Returns a function usable with .manipulate_lines().
+    """
+    ranges = list(ranges)
+
+    def _keep_ranges(lines:LINES) -> LINES:
+        return LineTimes(lines).keep(ranges, padding, close_gaps).apply()
+    return _keep_ranges
+
+
+def shift_lines(offset:timedelta) -> Callable[[LINES], LINES]:
+    """
+    Moves every line by `offset`. Times that would become negative are set to 0.
+
+    Returns a function usable with .manipulate_lines().
+    """
+    def _shift_lines(lines:LINES) -> LINES:
+        return LineTimes(lines).shift(offset).apply()
+    return _shift_lines
+
+
+def cut_frames(ranges:Iterable[tuple[int|None, int|None]], framerate:Fraction|float=Fraction(24000, 1001), close_gaps:bool=False) -> Callable[[LINES], LINES]:
+    """
+    Keeps the lines inside frame ranges and trims them like `trim_subs`.
+    With a single range and without `close_gaps` the result is the same as `trim_subs(first, last)`.
+    To follow a BD episode with the OP and ED cut out use `cut_frames([(0, op_start), (op_end, ed_start)], close_gaps=True)`.
+
+    Returns a function usable with .manipulate_lines().
+
+    Args:
+        ranges (Iterable[tuple[int | None, int | None]]): (first, last) frame pairs, None for an open bound.
+        framerate (Fraction | float): Framerate of the video.
+        close_gaps (bool): Moves the kept ranges back to back starting at 0, see `LineTimes.keep`.
+    """
+    ranges = [(None if start is None else frame_to_time(start, framerate), None if end is None else frame_to_time(end, framerate)) for start, end in ranges]
+    return keep_ranges(ranges, timedelta(milliseconds=float(1000 / framerate / 2)), close_gaps)
@@ -0,0 +1,268 @@
+import json
+import os
+import shutil
+import threading
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+from muxtools import GlobSearch, PathLike, SubFile, warn
+from .batch import EpisodeResult, restyle_season, _glob_root, _has_glob, _season_files
+from .restyle import restyle_cr
+from ..utils.results import result_cache, partial_digest
+
+
+__all__ = ["SeasonManifest", "restyle_changed", "watch_season"]
+
+
+def _config_key(restyle:Callable[..., SubFile], options:dict[str, Any]|None, track:dict[str, Any]|None) -> str:
+    # includes the code version, so updating the package restyles everything again
+    return result_cache.key(f"{restyle.__module__}.{restyle.__qualname__}", "restyle_changed", {"options": options or {}, "track": track or {}})
+
+
+class SeasonManifest:
+    """
+    Fingerprints of the episodes processed by `restyle_changed` and of the outputs made from them, stored as a JSON file.
+
+    An episode is current if the config is the same, its output wasn't changed or deleted and the input has the same size and mtime.
+    If only the mtime changed the input is compared by `partial_digest`, so copying the same file again doesn't restyle it.
+
+    Args:
+        path (PathLike): The JSON file. It's created by `write` if it doesn't exist.
+    """
+    def __init__(self, path:PathLike):
+        self.path = Path(path)
+        try:
+            self.episodes = dict[str, dict[str, Any]](json.loads(self.path.read_text(encoding="utf-8"))["episodes"])
+        except (OSError, ValueError, KeyError, TypeError):
+            self.episodes = dict[str, dict[str, Any]]()
+        self.modified = False
+
+    @staticmethod
+    def _key(file:Path) -> str:
+        return str(file.resolve())
+
+    def is_current(self, file:PathLike, config:str) -> bool:
+        """
+        Whether the output recorded for the file is still valid.
+        """
+        file = Path(file)
+        entry = self.episodes.get(self._key(file))
+        if entry is None or entry["config"] != config:
+            return False
+        try:
+            stat = file.stat()
+            output = Path(entry["output"]).stat()
+        except OSError:
+            return False
+        if [output.st_size, output.st_mtime_ns] != entry["output_stat"] or stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        if partial_digest(file) != entry["partial_digest"]:
+            return False
+        # the file was touched or copied again without changing
+        entry["mtime_ns"] = stat.st_mtime_ns
+        self.modified = True
+        return True
+
+    def update(self, file:PathLike, config:str, output:PathLike, container_delay:int=0) -> None:
+        """
+        Records the current fingerprint of the file and the output made from it.
+        """
+        file = Path(file)
+        output = Path(output)
+        stat = file.stat()
+        output_stat = output.stat()
+        self.episodes[self._key(file)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "partial_digest": partial_digest(file),
+            "config": config,
+            "output": str(output.resolve()),
+            "output_stat": [output_stat.st_size, output_stat.st_mtime_ns],
+            "container_delay": container_delay,
+        }
+        self.modified = True
+
+    def output(self, file:PathLike) -> SubFile|None:
+        """
+        Returns the recorded output of the file or None.
+        """
+        file = Path(file)
+        if (entry := self.episodes.get(self._key(file))) is None:
+            return None
+        return SubFile(Path(entry["output"]), container_delay=entry["container_delay"], source=file)
+
+    def write(self) -> None:
+        """
+        Writes the manifest if anything changed.
+        """
+        if not self.modified:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"episodes": self.episodes}, indent=2), encoding="utf-8")
+        tmp.replace(self.path)
+        self.modified = False
+
+
+def restyle_changed(
+    files:PathLike|GlobSearch|Sequence[PathLike],
+    output_dir:PathLike,
+    restyle:Callable[..., SubFile]=restyle_cr,
+    options:dict[str, Any]|None=None,
+    track:dict[str, Any]|None=None,
+    manifest:PathLike|None=None,
+    force:bool=False,
+    extract_workers:int=4,
+    restyle_workers:int|None=None,
+) -> list[EpisodeResult]:
+    """
+    Incremental `restyle_season`: only episodes whose input, config or output changed since the last run are extracted and restyled.
+
+    Outputs are copied to `output_dir` as `<episode stem>.ass` (or .srt), the results keep the SubFile in the workdir. The outputs are recorded in a `SeasonManifest` together with the fingerprints of the inputs.
+    The config is `restyle`, `options`, `track` and the package version, changing any of them restyles every episode.
+    Unchanged episodes get the recorded output and `skipped` set in their result.
+
+    Example usage:
+        ```py
+        results = restyle_changed("*.mkv", "subs", restyle_cr, options=dict(purge_macrons=False), track=dict(lang="de"))
+        ```
+
+    Args:
+        files (PathLike | GlobSearch | Sequence[PathLike]): The episodes, see `restyle_season`.
+        output_dir (PathLike): Directory of the restyled subtitles. Episodes must have unique file names.
+        restyle, options, track, extract_workers, restyle_workers: See `restyle_season`.
+        manifest (PathLike | None): The manifest file. Defaults to `manifest.json` in `output_dir`.
+        force (bool): Restyle every episode.
+
+    Returns:
+        list[EpisodeResult]: One result per file in input order.
+    """
+    files = _season_files(files)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    season = SeasonManifest(manifest or output_dir / "manifest.json")
+    config = _config_key(restyle, options, track)
+    results = [EpisodeResult(file) for file in files]
+    changed = list[int]()
+    for i, file in enumerate(files):
+        if not force and season.is_current(file, config):
+            results[i].subfile = season.output(file)
+            results[i].skipped = True
+        else:
+            changed.append(i)
+    if changed:
+        for i, result in zip(changed, restyle_season([files[i] for i in changed], restyle, options, track, extract_workers, restyle_workers)):
+            results[i] = result
+            if not result.ok:
+                continue
+            out = output_dir / f"{files[i].stem}{result.subfile.file.suffix}"
+            shutil.copyfile(result.subfile.file, out)
+            season.update(files[i], config, out, result.subfile.container_delay)
+    season.write()
+    return results
+
+
+def _watch_roots(files:PathLike|GlobSearch|Sequence[PathLike]) -> set[Path]:
+    if isinstance(files, str) and _has_glob(files):
+        return {_glob_root(files)[0]}
+    if isinstance(files, (str, os.PathLike)) and not Path(files).is_file():
+        return {Path.cwd()}
+    return {path.parent for path in _season_files(files)} or {Path.cwd()}
+
+
+def _observe(roots:set[Path], wake:threading.Event) -> Any:
+    """
+    Starts a watchdog observer that sets `wake` on any change below the roots, None if watchdog isn't installed.
+    """
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class _Wake(FileSystemEventHandler):
+        def on_any_event(self, event):
+            wake.set()
+
+    observer = Observer()
+    for root in roots:
+        observer.schedule(_Wake(), str(root), recursive=True)
+    observer.start()
+    return observer
+
+
+def watch_season(
+    files:PathLike|GlobSearch|Sequence[PathLike],
+    output_dir:PathLike,
+    restyle:Callable[..., SubFile]=restyle_cr,
+    options:dict[str, Any]|None=None,
+    track:dict[str, Any]|None=None,
+    manifest:PathLike|None=None,
+    interval:float=5.0,
+    settle:float=2.0,
+    on_results:Callable[[list[EpisodeResult]], None]|None=None,
+    max_runs:int|None=None,
+    polling:bool=False,
+    extract_workers:int=4,
+    restyle_workers:int|None=None,
+) -> None:
+    """
+    Watches the episodes and runs `restyle_changed` for every episode that appears or changes, until interrupted with Ctrl+C.
+
+    The files are checked every `interval` seconds. An episode is only processed once it wasn't modified for `settle` seconds, so files that are still being copied are left alone.
+    If `watchdog` is installed, file system events wake the loop up right away, otherwise (or with `polling`) it only polls.
+    Episodes that failed are tried again once they change.
+
+    Example usage:
+        ```py
+        watch_season("*.mkv", "subs", restyle_bd_dx, on_results=lambda results: print([result.file.name for result in results]))
+        ```
+
+    Args:
+        files (PathLike | GlobSearch | Sequence[PathLike]): The episodes, see `restyle_season`. Use a glob string to pick up new files, a GlobSearch is only searched once.
+        output_dir, restyle, options, track, manifest, extract_workers, restyle_workers: See `restyle_changed`.
+        interval (float): Seconds between checks.
+        settle (float): Seconds an episode has to stay unchanged before it is processed.
+        on_results (Callable[[list[EpisodeResult]], None] | None): Called with the results of every run.
+        max_runs (int | None): Return after this many runs of `restyle_changed`. None watches until interrupted.
+        polling (bool): Don't use watchdog even if it's installed.
+    """
+    wake = threading.Event()
+    observer = None if polling else _observe(_watch_roots(files), wake)
+    # path -> (size, mtime) when it was last processed
+    done = dict[Path, tuple[int, int]]()
+    runs = 0
+    try:
+        while max_runs is None or runs < max_runs:
+            ready = list[tuple[Path, tuple[int, int]]]()
+            waiting = False
+            for file in _season_files(files):
+                try:
+                    stat = file.stat()
+                except OSError:
+                    continue
+                state = (stat.st_size, stat.st_mtime_ns)
+                if done.get(file) == state:
+                    continue
+                if time.time() - stat.st_mtime_ns / 1e9 < settle:
+                    waiting = True
+                    continue
+                ready.append((file, state))
+            if ready:
+                results = restyle_changed([file for file, _ in ready], output_dir, restyle, options, track, manifest, extract_workers=extract_workers, restyle_workers=restyle_workers)
+                done.update(ready)
+                runs += 1
+                if on_results is not None:
+                    on_results(results)
+                continue
+            wake.wait(min(settle, interval) if waiting else interval)
+            wake.clear()
+    except KeyboardInterrupt:
+        warn("Stopped watching.", "watch_season")
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
@@ -0,0 +1,8 @@
+from .._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "probe": ["ProbeCache", "probe_cache", "cached_probe"],
+    "matroska": ["MatroskaError", "MatroskaTrack", "MatroskaFile", "read_matroska_tracks"],
+    "results": ["ResultCache", "result_cache", "file_digest", "file_stamp", "partial_digest"],
+    "trace": ["Tracer", "traced", "traced_factory", "traced_manipulator", "current_tracer"],
+})
@@ -0,0 +1,233 @@
+import mmap
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from muxtools import ParsedFile, PathLike, TrackType, ensure_path_exists
+from langcodes import Language
+
+
+__all__ = ["MatroskaError", "MatroskaTrack", "MatroskaFile", "read_matroska_tracks"]
+
+
+# Element IDs, see https://www.matroska.org/technical/elements.html
+_EBML = 0x1A45DFA3
+_SEGMENT = 0x18538067
+_SEEK_HEAD = 0x114D9B74
+_SEEK = 0x4DBB
+_SEEK_ID = 0x53AB
+_SEEK_POSITION = 0x53AC
+_TRACKS = 0x1654AE6B
+_TRACK_ENTRY = 0xAE
+_TRACK_NUMBER = 0xD7
+_TRACK_TYPE = 0x83
+_FLAG_ENABLED = 0xB9
+_FLAG_DEFAULT = 0x88
+_FLAG_FORCED = 0x55AA
+_NAME = 0x536E
+_LANGUAGE = 0x22B59C
+_LANGUAGE_BCP47 = 0x22B59D
+_CODEC_ID = 0x86
+
+_TRACK_TYPES = {1: TrackType.VIDEO, 2: TrackType.AUDIO, 17: TrackType.SUB}
+# what ffprobe would call the codec, only the ones this package cares about
+_CODEC_NAMES = {"S_TEXT/ASS": "ass", "S_TEXT/SSA": "ass", "S_TEXT/UTF8": "subrip", "S_HDMV/PGS": "hdmv_pgs_subtitle", "S_VOBSUB": "dvd_subtitle"}
+
+
+class MatroskaError(ValueError):
+    """Raised if a file is not a Matroska file or its track headers can't be read."""
+
+
+@dataclass
+class MatroskaTrack:
+    """
+    Track header information read directly from the file.
+    Has the attributes `ParsedFile.find_tracks` filters on, so it can be used in place of a `TrackInfo` for track selection.
+    """
+    index: int
+    """Track ID as used by mkvmerge and mkvextract."""
+    relative_index: int
+    """Index relative to the other tracks of the same type."""
+    number: int
+    type: TrackType | None
+    codec_id: str
+    title: str | None
+    language: str
+    language_ietf: str | None
+    is_default: bool
+    is_forced: bool
+    is_enabled: bool
+    container_delay: int = 0
+    """Always 0, reading the delay needs the first blocks of the track. Use `ParsedFile` if you need it."""
+
+    @property
+    def codec_name(self) -> str:
+        return _CODEC_NAMES.get(self.codec_id, self.codec_id)
+
+    @property
+    def sanitized_lang(self) -> Language:
+        # matroska spec says the 3 letter code should be ignored if the BCP 47 one is present
+        return Language.get(self.language_ietf or self.language or "und")
+
+
+@dataclass
+class MatroskaFile:
+    """
+    Tracks of a Matroska file. `find_tracks` works the same as `ParsedFile.find_tracks`.
+    """
+    tracks: list[MatroskaTrack]
+    source: Path
+
+    find_tracks = ParsedFile.find_tracks
+
+
+def _read_vint(data:mmap.mmap, pos:int, keep_marker:bool) -> tuple[int, int, bool]:
+    """
+    Returns the value, the position after it and whether all value bits are set (unknown size).
+    """
+    if pos >= len(data):
+        raise MatroskaError("Unexpected end of file.")
+    first = data[pos]
+    if not first:
+        raise MatroskaError(f"Invalid variable size integer at {pos}.")
+    length = 8 - first.bit_length() + 1
+    value = first if keep_marker else first & (0xFF >> length)
+    for byte in data[pos + 1:pos + length]:
+        value = (value << 8) | byte
+    unknown = not keep_marker and value == (1 << (7 * length)) - 1
+    return value, pos + length, unknown
+
+
+def _read_header(data:mmap.mmap, pos:int) -> tuple[int, int, int|None]:
+    """
+    Returns the element ID, the start of its data and its size (None if unknown).
+    """
+    element_id, pos, _ = _read_vint(data, pos, True)
+    size, pos, unknown = _read_vint(data, pos, False)
+    return element_id, pos, None if unknown else size
+
+
+def _children(data:mmap.mmap, start:int, end:int):
+    pos = start
+    while pos < end:
+        element_id, data_start, size = _read_header(data, pos)
+        if size is None:
+            raise MatroskaError(f"Element {element_id:X} inside a master element has an unknown size.")
+        yield element_id, data_start, size
+        pos = data_start + size
+
+
+def _uint(data:mmap.mmap, start:int, size:int) -> int:
+    return int.from_bytes(data[start:start + size], "big")
+
+
+def _string(data:mmap.mmap, start:int, size:int) -> str:
+    return data[start:start + size].rstrip(b"\x00").decode("utf-8", errors="replace")
+
+
+def _find_tracks_element(data:mmap.mmap, segment_start:int, segment_end:int) -> tuple[int, int]:
+    pos = segment_start
+    while pos < segment_end:
+        element_id, data_start, size = _read_header(data, pos)
+        if element_id == _TRACKS:
+            if size is None:
+                raise MatroskaError("Tracks element has an unknown size.")
+            return data_start, size
+        if element_id == _SEEK_HEAD and size is not None:
+            for seek_id, seek_start, seek_size in _children(data, data_start, data_start + size):
+                if seek_id != _SEEK:
+                    continue
+                target, position = None, None
+                for child_id, child_start, child_size in _children(data, seek_start, seek_start + seek_size):
+                    if child_id == _SEEK_ID:
+                        target = _uint(data, child_start, child_size)
+                    elif child_id == _SEEK_POSITION:
+                        position = _uint(data, child_start, child_size)
+                if target == _TRACKS and position is not None and segment_start + position < segment_end:
+                    tracks_id, tracks_start, tracks_size = _read_header(data, segment_start + position)
+                    if tracks_id == _TRACKS and tracks_size is not None:
+                        return tracks_start, tracks_size
+        if size is None:
+            # unknown sized clusters (live recordings) can only be skipped by parsing their blocks
+            raise MatroskaError("Reached an element with unknown size before finding the track headers.")
+        # Clusters and everything else are skipped without touching their data
+        pos = data_start + size
+    raise MatroskaError("No Tracks element found.")
+
+
+def _flag(data:mmap.mmap, start:int, size:int) -> bool:
+    return bool(_uint(data, start, size))
+
+
+_ENTRY_FIELDS = {
+    _TRACK_NUMBER: ("number", _uint),
+    _TRACK_TYPE: ("type", _uint),
+    _CODEC_ID: ("codec_id", _string),
+    _NAME: ("title", _string),
+    _LANGUAGE: ("language", _string),
+    _LANGUAGE_BCP47: ("language_ietf", _string),
+    _FLAG_DEFAULT: ("is_default", _flag),
+    _FLAG_FORCED: ("is_forced", _flag),
+    _FLAG_ENABLED: ("is_enabled", _flag),
+}
+
+
+def _parse_track_entry(data:mmap.mmap, start:int, size:int) -> dict[str, Any]:
+    # defaults from the spec
+    entry = {
+        "number": 0, "type": 0, "codec_id": "", "title": None, "language": "eng", "language_ietf": None,
+        "is_default": True, "is_forced": False, "is_enabled": True,
+    }
+    for element_id, child_start, child_size in _children(data, start, start + size):
+        if (field := _ENTRY_FIELDS.get(element_id)) is not None:
+            name, read = field
+            entry[name] = read(data, child_start, child_size)
+    return entry
+
+
+def read_matroska_tracks(file:PathLike, caller:Any|None=None) -> MatroskaFile:
+    """
+    Reads the track headers of a Matroska file without spawning mkvmerge or ffprobe.
+
+    The file is memory-mapped and only the EBML header, the SeekHead and the Tracks element are read.
+    Clusters and other elements are skipped by their size, so no media data is touched.
+
+    Args:
+        file (PathLike): Input MKV file.
+
+    Returns:
+        MatroskaFile: All tracks with type, codec, name, languages and flags.
+
+    Raises:
+        MatroskaError: If the file is not a Matroska file or the track headers can't be found.
+    """
+    file = ensure_path_exists(file, caller)
+    with open(file, "rb") as reader:
+        try:
+            data = mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise MatroskaError(f"'{file.name}' is empty.") from None
+        with data:
+            element_id, data_start, size = _read_header(data, 0)
+            if element_id != _EBML or size is None:
+                raise MatroskaError(f"'{file.name}' is not a Matroska file.")
+            pos = data_start + size
+            # skip Void elements between the header and the segment
+            while True:
+                element_id, segment_start, segment_size = _read_header(data, pos)
+                if element_id == _SEGMENT:
+                    break
+                if segment_size is None:
+                    raise MatroskaError(f"'{file.name}' does not contain a Segment.")
+                pos = segment_start + segment_size
+            segment_end = len(data) if segment_size is None else min(segment_start + segment_size, len(data))
+            tracks_start, tracks_size = _find_tracks_element(data, segment_start, segment_end)
+            entries = [_parse_track_entry(data, start, size) for element_id, start, size in _children(data, tracks_start, tracks_start + tracks_size) if element_id == _TRACK_ENTRY]
+
+    tracks = list[MatroskaTrack]()
+    type_counts = dict[TrackType | None, int]()
+    for index, entry in enumerate(entries):
+        track_type = _TRACK_TYPES.get(entry.pop("type"))
+        relative_index = type_counts.get(track_type, 0)
+        type_counts[track_type] = relative_index + 1
+        tracks.append(MatroskaTrack(index=index, relative_index=relative_index, type=track_type, **entry))
+    return MatroskaFile(tracks, file)
@@ -0,0 +1,126 @@
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+from muxtools import ParsedFile, PathLike, ensure_path_exists, debug, warn
+
+
+__all__ = ["ProbeCache", "probe_cache", "cached_probe"]
+
+
+class ProbeCache:
+    """
+    Cache for `ParsedFile.from_file` results keyed on path, size and mtime.
+
+    Results are kept in an in-process LRU and, if `cache_dir` is set, also pickled to disk so re-runs of a script skip probing entirely.
+    A file that changed on disk gets a new key, old entries simply fall out of the LRU.
+    Safe to use from several threads, e.g. the extraction threads of `restyle_season`. Files are probed outside the lock,
+    so two threads asking for the same uncached file at once may both probe it.
+
+    Args:
+        maxsize (int): Number of files kept in memory.
+        cache_dir (PathLike | None): Directory for the on-disk store. Set to None to only cache in memory.
+    """
+    def __init__(self, maxsize:int=128, cache_dir:PathLike|None=None):
+        self.maxsize = maxsize
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, int, int], ParsedFile] = OrderedDict()
+        # guards the entries and the counters
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(file:Path) -> tuple[str, int, int]:
+        stat = file.stat()
+        return (str(file.resolve()), stat.st_size, stat.st_mtime_ns)
+
+    def _disk_path(self, key:tuple[str, int, int]) -> Path:
+        return self.cache_dir / f"{hashlib.sha1(repr(key).encode()).hexdigest()}.pickle"
+
+    def _load(self, key:tuple[str, int, int]) -> ParsedFile|None:
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        if not path.is_file():
+            return None
+        try:
+            with open(path, "rb") as reader:
+                return pickle.load(reader)
+        except Exception:
+            # outdated or broken entry, probe again and overwrite it
+            return None
+
+    def _store(self, key:tuple[str, int, int], parsed:ParsedFile) -> None:
+        if not self.cache_dir:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._disk_path(key)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "wb") as writer:
+                pickle.dump(parsed, writer)
+            tmp.replace(path)
+        except Exception as e:
+            warn(f"Could not write probe cache entry: {e}", self)
+
+    def get(self, file:PathLike, caller:Any|None=None) -> ParsedFile:
+        """
+        Returns the parsed file, probing it only if it isn't cached yet.
+        """
+        file = ensure_path_exists(file, caller)
+        key = self._key(file)
+        with self._lock:
+            if (parsed := self._entries.get(key)) is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return parsed
+        if (parsed := self._load(key)) is not None:
+            disk_hit = True
+        else:
+            disk_hit = False
+            parsed = ParsedFile.from_file(file, caller)
+            self._store(key, parsed)
+        with self._lock:
+            if disk_hit:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+            self._entries[key] = parsed
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return parsed
+
+    def clear(self, disk:bool=False) -> None:
+        """
+        Empties the in-memory cache and resets the counters. Set `disk` to also delete the on-disk store.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+        if disk and self.cache_dir and self.cache_dir.is_dir():
+            for path in self.cache_dir.glob("*.pickle"):
+                path.unlink(True)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses, "size": len(self._entries)}
+
+    def report(self) -> None:
+        stats = self.stats()
+        debug(f"{stats['hits']} hits, {stats['disk_hits']} disk hits, {stats['misses']} misses, {stats['size']} cached", self)
+
+
+probe_cache = ProbeCache()
+"""Shared cache used by the helpers in this package. Set `probe_cache.cache_dir` to enable the on-disk store."""
+
+
+def cached_probe(file:PathLike, caller:Any|None=None) -> ParsedFile:
+    """
+    Drop-in for `ParsedFile.from_file` that goes through the shared `probe_cache`.
+    """
+    return probe_cache.get(file, caller)
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import time
+from enum import Enum
+from functools import cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+from muxtools import PathLike, debug, warn
+from ass import Style
+
+
+__all__ = ["ResultCache", "result_cache", "file_digest", "file_stamp", "partial_digest"]
+
+
+def file_digest(file:PathLike) -> str:
+    """
+    SHA-256 of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(file, "rb") as reader:
+        while chunk := reader.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_stamp(file:PathLike) -> str:
+    """
+    Path, size and mtime of a file. Used for containers that are too large to hash on every run.
+    """
+    file = Path(file)
+    stat = file.stat()
+    return f"{file.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def partial_digest(file:PathLike, block:int=1 << 20) -> str:
+    """
+    SHA-256 of the size, the first and the last `block` bytes of a file. Fast enough for containers, but misses changes in the middle of large files.
+    """
+    digest = hashlib.sha256()
+    with open(file, "rb") as reader:
+        size = reader.seek(0, os.SEEK_END)
+        digest.update(str(size).encode())
+        reader.seek(0)
+        digest.update(reader.read(block))
+        if size > block:
+            reader.seek(max(size - block, block))
+            digest.update(reader.read(block))
+    return digest.hexdigest()
+
+
+@cache
+def _code_version() -> str:
+    """
+    Versions of the dependencies that change the output and a hash of this package's source, so edits to an uninstalled checkout invalidate the cache too.
+    """
+    digest = hashlib.sha256()
+    for dependency in ("muxtools", "ass", "ass_tag_analyzer"):
+        try:
+            digest.update(f"{dependency}={version(dependency)};".encode())
+        except PackageNotFoundError:
+            pass
+    for path in sorted(Path(__file__).parents[1].rglob("*.py")):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _serialize(value:Any) -> Any:
+    if isinstance(value, Style):
+        return value.dump_with_type()
+    if isinstance(value, (list, tuple)):
+        return [_serialize(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _serialize(item) for key, item in value.items()}
+    if isinstance(value, Enum):
+        return f"{type(value).__name__}.{value.name}"
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+class ResultCache:
+    """
+    Persistent cache for output files keyed on the input, the options and the code version.
+
+    Disabled until `cache_dir` is set. Every entry is a data file plus a small JSON file with metadata.
+    Entries are evicted least recently used first once the data files exceed `max_size` bytes.
+
+    Example usage:
+        ```py
+        result_cache.cache_dir = Path(".cache/results")
+        for episode in episodes:
+            restyle_cr(get_sub_track(episode, lang="de"))
+        result_cache.report()
+        ```
+
+    Args:
+        cache_dir (PathLike | None): Directory of the cache. Set to None to disable it.
+        max_size (int): Maximum size of all cached files in bytes.
+    """
+    def __init__(self, cache_dir:PathLike|None=None, max_size:int=1 << 30):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache_dir is not None
+
+    def key(self, name:str, source:str, options:dict[str, Any]) -> str:
+        """
+        Builds the key of a result.
+
+        Args:
+            name (str): The operation, e.g. the function name.
+            source (str): Identifies the input, see `file_digest` and `file_stamp`.
+            options (dict[str, Any]): Every option that changes the output. Styles are serialized with all of their fields.
+        """
+        payload = json.dumps([name, source, _serialize(options), _code_version()], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _paths(self, key:str) -> tuple[Path, Path]:
+        return self.cache_dir / f"{key}.data", self.cache_dir / f"{key}.json"
+
+    def get(self, key:str) -> tuple[bytes, dict[str, Any]]|None:
+        """
+        Returns the cached data and metadata or None.
+        """
+        if not self.enabled:
+            return None
+        data_path, meta_path = self._paths(key)
+        try:
+            data = data_path.read_bytes()
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            # the metadata mtime is the last access for the LRU
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data, meta
+
+    def put(self, key:str, data:bytes, meta:dict[str, Any]|None=None) -> None:
+        """
+        Stores the data of a result and evicts old entries if the cache got too large.
+        """
+        if not self.enabled:
+            return
+        data_path, meta_path = self._paths(key)
+        meta = dict(meta or {}, created=time.time(), size=len(data))
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            for path, content in ((data_path, data), (meta_path, json.dumps(meta).encode())):
+                tmp = path.with_suffix(".tmp")
+                tmp.write_bytes(content)
+                tmp.replace(path)
+        except OSError as e:
+            warn(f"Could not write result cache entry: {e}", self)
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = sorted(self._entry_paths(), key=lambda entry: entry[2])
+        total = sum(size for _, _, _, size in entries)
+        for data_path, meta_path, _, size in entries:
+            if total <= self.max_size:
+                break
+            meta_path.unlink(True)
+            data_path.unlink(True)
+            total -= size
+
+    def _entry_paths(self) -> list[tuple[Path, Path, float, int]]:
+        if not self.enabled or not self.cache_dir.is_dir():
+            return []
+        entries = []
+        for meta_path in self.cache_dir.glob("*.json"):
+            data_path = meta_path.with_suffix(".data")
+            try:
+                entries.append((data_path, meta_path, meta_path.stat().st_mtime, data_path.stat().st_size))
+            except OSError:
+                continue
+        return entries
+
+    def entries(self) -> list[dict[str, Any]]:
+        """
+        Returns the metadata of every entry with its key and last access time, most recently used first.
+        """
+        entries = []
+        for data_path, meta_path, accessed, size in sorted(self._entry_paths(), key=lambda entry: entry[2], reverse=True):
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            entries.append(dict(meta, key=meta_path.stem, accessed=accessed, size=size))
+        return entries
+
+    def size(self) -> int:
+        return sum(size for _, _, _, size in self._entry_paths())
+
+    def clear(self) -> None:
+        """
+        Deletes every entry and resets the counters.
+        """
+        self.hits = self.misses = 0
+        for data_path, meta_path, _, _ in self._entry_paths():
+            meta_path.unlink(True)
+            data_path.unlink(True)
+
+    def stats(self) -> dict[str, int]:
+        entries = self._entry_paths()
+        return {"hits": self.hits, "misses": self.misses, "entries": len(entries), "bytes": sum(size for _, _, _, size in entries)}
+
+    def report(self) -> None:
+        stats = self.stats()
+        debug(f"{stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries using {stats['bytes'] / (1 << 20):.1f} MiB", self)
+
+
+result_cache = ResultCache()
+"""Shared cache used by `restyle_cr`, `restyle_bd_dx` and `get_sub_track`. Set `result_cache.cache_dir` to enable it."""
@@ -0,0 +1,290 @@
+import json
+import os
+import subprocess
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Literal
+from muxtools import PathLike, SubFile, debug
+
+
+__all__ = ["Tracer", "traced", "traced_factory", "traced_manipulator", "current_tracer"]
+
+
+_active: "Tracer|None" = None
+# only the outermost manipulator of nested ones (e.g. remove_credits calling the filter built by credit_filter) gets a span
+_local = threading.local()
+
+
+def current_tracer() -> "Tracer|None":
+    """
+    Returns the active tracer or None.
+    """
+    return _active
+
+
+def _io_counters() -> tuple[int, int]|None:
+    """
+    Bytes read and written by this process so far. Only available on Linux, subprocesses are not included.
+    """
+    try:
+        with open("/proc/self/io", "rb") as reader:
+            counters = dict(line.split(b":") for line in reader.read().splitlines())
+        return int(counters[b"rchar"]), int(counters[b"wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _line_state(line:Any) -> tuple:
+    return line.text, line.style, line.start, line.end, line.layer, line.name, line.TYPE
+
+
+class Tracer:
+    """
+    Records where the time goes while it is active: instrumented functions, subprocesses (mkvmerge, mkvextract, ffprobe, ...),
+    ASS parsing and writing and every manipulator built by `line_manipulators`.
+
+    Every span stores its wall time, functions also the bytes read and written by this process (Linux only) and the subprocesses started,
+    manipulators the number of lines they got, removed and changed, parsing and writing the size of the file.
+    Only one tracer is active at a time, a nested one collects the spans until it exits. Instrumented code checks a single global while no tracer is active.
+    Work done in other processes, e.g. the restyle workers of `restyle_season`, isn't recorded.
+
+    Example usage:
+        ```py
+        with Tracer() as tracer:
+            restyle_cr(get_sub_track(file, lang="en"))
+        tracer.report()
+        tracer.write("trace.json")  # open in chrome://tracing or ui.perfetto.dev
+        ```
+    """
+    def __init__(self):
+        self.spans = list[dict[str, Any]]()
+        self.subprocesses = 0
+        self._origin = time.perf_counter()
+        self._previous: Tracer|None = None
+        self._lock = threading.Lock()
+
+    def add(self, name:str, category:str, start:float, end:float, **args:Any) -> None:
+        """
+        Records a finished span. `start` and `end` are `time.perf_counter()` values.
+        """
+        span = {"name": name, "category": category, "start": start - self._origin, "duration": end - start, "thread": threading.get_ident(), "args": args}
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name:str, category:str="function", **args:Any) -> Iterator[dict[str, Any]]:
+        """
+        Records the code inside the context as a span. Values added to the yielded dict are stored with it.
+        """
+        io = _io_counters()
+        subprocesses = self.subprocesses
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            if io is not None and (after := _io_counters()) is not None:
+                args["read_bytes"] = after[0] - io[0]
+                args["written_bytes"] = after[1] - io[1]
+            args["subprocesses"] = self.subprocesses - subprocesses
+            self.add(name, category, start, end, **args)
+
+    def run_manipulator(self, name:str, func:Callable, lines:list) -> Any:
+        before = {id(line): _line_state(line) for line in lines}
+        start = time.perf_counter()
+        result = func(lines)
+        end = time.perf_counter()
+        out = lines if result is None else result
+        changed = sum(1 for line in out if before.get(id(line)) != _line_state(line))
+        self.add(name, "manipulator", start, end, lines=len(lines), removed=len(lines) - len(out), changed=changed)
+        return result
+
+    def __enter__(self) -> "Tracer":
+        global _active
+        self._previous = _active
+        if _active is None:
+            _patch()
+        _active = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        global _active
+        _active = self._previous
+        self._previous = None
+        if _active is None:
+            _unpatch()
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """
+        Returns the number of calls, the total seconds and the sums of the numeric values of every span name, slowest first.
+        """
+        summary = dict[str, dict[str, Any]]()
+        for span in self.spans:
+            entry = summary.setdefault(span["name"], {"category": span["category"], "calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += span["duration"]
+            for key, value in span["args"].items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    entry[key] = entry.get(key, 0) + value
+        return dict(sorted(summary.items(), key=lambda item: item[1]["seconds"], reverse=True))
+
+    def report(self) -> None:
+        for name, entry in self.summary().items():
+            extra = ", ".join(f"{key} {value}" for key, value in entry.items() if key not in ("category", "calls", "seconds"))
+            debug(f"{entry['seconds'] * 1000:9.2f} ms  {entry['calls']:4}x  {name}" + (f" ({extra})" if extra else ""), self)
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """
+        Returns the spans in the Chrome trace event format.
+        """
+        pid = os.getpid()
+        events = [
+            {"name": span["name"], "cat": span["category"], "ph": "X", "ts": span["start"] * 1e6, "dur": span["duration"] * 1e6, "pid": pid, "tid": span["thread"], "args": span["args"]}
+            for span in self.spans
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, file:PathLike, format:Literal["chrome", "json"]="chrome") -> Path:
+        """
+        Writes the spans as a Chrome trace (chrome://tracing, ui.perfetto.dev) or as plain JSON with the spans and the summary.
+        """
+        file = Path(file)
+        content = self.chrome_trace() if format == "chrome" else {"spans": self.spans, "summary": self.summary()}
+        file.write_text(json.dumps(content, default=str), encoding="utf-8")
+        return file
+
+
+_originals = dict[str, Any]()
+
+
+def _patch() -> None:
+    """
+    Wraps Popen and the ASS parsing and writing of SubFile while a tracer is active, so they cost nothing otherwise.
+    """
+    popen_init = subprocess.Popen.__init__
+    popen_wait = subprocess.Popen.wait
+    read_doc = SubFile._read_doc
+    update_doc = SubFile._update_doc
+    _originals.update(popen_init=popen_init, popen_wait=popen_wait, read_doc=read_doc, update_doc=update_doc, own_read="_read_doc" in vars(SubFile), own_update="_update_doc" in vars(SubFile))
+
+    @wraps(popen_init)
+    def _init(self, args, *rest, **kwargs):
+        self._trace_start = time.perf_counter()
+        popen_init(self, args, *rest, **kwargs)
+        if (tracer := _active) is not None:
+            with tracer._lock:
+                tracer.subprocesses += 1
+
+    @wraps(popen_wait)
+    def _wait(self, *args, **kwargs):
+        running = self.returncode is None
+        result = popen_wait(self, *args, **kwargs)
+        if running and (tracer := _active) is not None and (start := getattr(self, "_trace_start", None)) is not None:
+            command = self.args if isinstance(self.args, str) else " ".join(map(str, self.args))
+            tracer.add(Path(command.split(" ", 1)[0].strip('"')).stem, "subprocess", start, time.perf_counter(), command=command, returncode=self.returncode)
+        return result
+
+    @wraps(read_doc)
+    def _read_doc(self, file=None):
+        if (tracer := _active) is None:
+            return read_doc(self, file)
+        start = time.perf_counter()
+        doc = read_doc(self, file)
+        path = Path(file or self.file)
+        tracer.add("parse", "ass", start, time.perf_counter(), file=path.name, bytes=path.stat().st_size, lines=len(doc.events))
+        return doc
+
+    @wraps(update_doc)
+    def _update_doc(self, doc):
+        if (tracer := _active) is None:
+            return update_doc(self, doc)
+        start = time.perf_counter()
+        result = update_doc(self, doc)
+        tracer.add("write", "ass", start, time.perf_counter(), file=self.file.name, bytes=Path(self.file).stat().st_size, lines=len(doc.events))
+        return result
+
+    subprocess.Popen.__init__ = _init
+    subprocess.Popen.wait = _wait
+    SubFile._read_doc = _read_doc
+    SubFile._update_doc = _update_doc
+
+
+def _unpatch() -> None:
+    subprocess.Popen.__init__ = _originals["popen_init"]
+    subprocess.Popen.wait = _originals["popen_wait"]
+    for name, original, own in (("_read_doc", _originals["read_doc"], _originals["own_read"]), ("_update_doc", _originals["update_doc"], _originals["own_update"])):
+        if own:
+            setattr(SubFile, name, original)
+        else:
+            delattr(SubFile, name)
+    _originals.clear()
+
+
+def traced(name:str|None=None, category:str="function") -> Callable[[Callable], Callable]:
+    """
+    Records every call of the decorated function as a span while a tracer is active.
+    """
+    def _decorator(func:Callable) -> Callable:
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def _traced(*args, **kwargs):
+            if (tracer := _active) is None:
+                return func(*args, **kwargs)
+            with tracer.span(span_name, category):
+                return func(*args, **kwargs)
+        return _traced
+    return _decorator
+
+
+# attributes LinePipeline uses to fuse manipulators, see subtitle.pipeline
+_FUSION_HOOKS = ("per_line", "removes")
+
+
+def traced_manipulator(func:Callable|None=None, name:str|None=None, fuse_as:Callable|None=None) -> Callable:
+    """
+    Wraps a function usable with .manipulate_lines() so every call is recorded with the lines it got, removed and changed while a tracer is active.
+    The `per_line` and `removes` hooks of `func` are copied to the wrapper, so `LinePipeline` can still fuse it.
+
+    Can be used as `@traced_manipulator` or `@traced_manipulator(fuse_as=...)`.
+
+    Args:
+        func (Callable | None): The manipulator.
+        name (str | None): Name of its spans, defaults to the name of `func`.
+        fuse_as (Callable | None): Take the hooks from this manipulator instead, for functions that only call a prebuilt one.
+    """
+    if func is None:
+        return lambda func: traced_manipulator(func, name, fuse_as)
+    span_name = name or func.__name__
+
+    @wraps(func)
+    def _traced(lines):
+        if (tracer := _active) is None or getattr(_local, "manipulating", False):
+            return func(lines)
+        _local.manipulating = True
+        try:
+            return tracer.run_manipulator(span_name, func, lines)
+        finally:
+            _local.manipulating = False
+    hooks = fuse_as if fuse_as is not None else func
+    for hook in _FUSION_HOOKS:
+        if (value := getattr(hooks, hook, None)) is not None:
+            setattr(_traced, hook, value)
+    return _traced
+
+
+def traced_factory(factory:Callable[..., Callable]) -> Callable[..., Callable]:
+    """
+    Decorates a manipulator factory so every manipulator it returns is wrapped by `traced_manipulator` and named after the factory.
+    The name is also its `__name__`, so `LinePipeline` stages show `replace_substr` instead of the inner function.
+    """
+    @wraps(factory)
+    def _factory(*args, **kwargs):
+        manipulator = traced_manipulator(factory(*args, **kwargs), factory.__name__)
+        manipulator.__name__ = manipulator.__qualname__ = factory.__name__
+        return manipulator
+    return _factory